@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import os
 from telethon import TelegramClient
@@ -9,22 +10,27 @@ load_dotenv()
 API_ID = int(os.getenv("TG_API_ID"))
 API_HASH = os.getenv("TG_API_HASH")
 
-async def test():
+async def test(reuse: bool = False):
     print("[STEP 1] Спроба ініціалізації клієнта...")
+    # Використовуємо вже авторизований файл сесії - лише connect(), без start()/логіну
     client = TelegramClient('aibi_session', API_ID, API_HASH)
     
     try:
         print("[STEP 2] Підключення до Telegram API...")
         await client.connect()
-        
-        if not await client.is_user_authorized():
-            print("[!!!] ПОМИЛКА: Сесія не авторизована. Потрібен вхід.")
-            return
 
+        # get_me() одночасно перевіряє авторизацію (None - сесія не авторизована)
         print("[STEP 3] Отримання даних акаунта...")
         me = await client.get_me()
+        if me is None:
+            print("[!!!] ПОМИЛКА: Сесія не авторизована. Потрібен вхід.")
+            return
         print(f"[SUCCESS] Увійшов як: {me.first_name} | ID: {me.id} | Phone: {me.phone}")
 
+        if reuse:
+            print("[FINISH] --reuse: сесія валідна, тестове повідомлення пропущено.")
+            return
+
         print("[STEP 4] Надсилаю повідомлення клієнту...")
 # STEP 4: Надсилаю повідомлення клієнту
         # Заміни 'username_тут' на реальний нікнейм (наприклад, '@illia_name')
@@ -45,4 +51,8 @@ async def test():
         print("[END] З'єднання розірвано.")
 
 if __name__ == "__main__":
-    asyncio.run(test())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Швидка перевірка Telegram-сесії")
+    parser.add_argument("--reuse", action="store_true",
+                        help="лише перевірити з'єднання існуючої сесії, без надсилання повідомлення")
+    args = parser.parse_args()
+    asyncio.run(test(reuse=args.reuse))
@@ -1,72 +1,196 @@
 import json
-import re
+import time
 import asyncio
-from typing import List, Tuple, Protocol
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Protocol
 from openai import AsyncOpenAI
 from utils import ChatHistory
+from http_clients import get_perplexity_client, get_request_semaphore
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Парсить JSON з першої '{' за один прохід (коректно обробляє вкладені об'єкти)
+_JSON_DECODER = json.JSONDecoder()
+
+
+def loads_json_object(text: str, start: int):
+    """
+    Декодує JSON-об'єкт, що починається з text[start].
+
+    Швидкий шлях - orjson на відрізку до останньої '}'; якщо після JSON є ще текст
+    з дужками, повертаємось до json.JSONDecoder.raw_decode.
+    Raises json.JSONDecodeError (orjson.JSONDecodeError - його підклас).
+    """
+    if ORJSON_AVAILABLE:
+        end = text.rfind("}")
+        if end > start:
+            try:
+                return orjson.loads(text[start:end + 1])
+            except orjson.JSONDecodeError:
+                pass
+    return _JSON_DECODER.raw_decode(text, start)[0]
+
+
+def _has_complete_json(text: str) -> bool:
+    """Чи містить текст вже завершений JSON-об'єкт (для раннього виходу зі стріму)"""
+    start = text.find("{")
+    if start < 0:
+        return False
+    try:
+        loads_json_object(text, start)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+async def collect_completion_stream(stream) -> str:
+    """
+    Збирає стрімінгову відповідь LLM.
+
+    Як тільки надійшла закриваюча дужка і JSON розпарсився - закриваємо стрім,
+    не чекаючи хвоста відповіді (пояснення, посилання тощо).
+    """
+    buf = ""
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buf += delta
+            if "}" in delta and _has_complete_json(buf):
+                break
+    finally:
+        await stream.close()
+    return buf
+
+# Кеш відповідей агентів: повторний аналіз того ж чату не йде в API
+_CACHE_MAX_SIZE = 512
+_CACHE_TTL = 15 * 60  # секунд - після цього чат аналізується заново
+_CACHE: "OrderedDict[bytes, Tuple[float, Tuple[str, int]]]" = OrderedDict()
+# Аналізатори працюють і в циклі бота, і в потоці планувальника - get/del/move_to_end під одним lock
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(*parts: str) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.digest()
+
+
+def _cache_get(key: bytes) -> Optional[Tuple[str, int]]:
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > _CACHE_TTL:
+            del _CACHE[key]
+            return None
+        _CACHE.move_to_end(key)
+        return result
+
+
+def _cache_put(key: bytes, result: Tuple[str, int]) -> None:
+    with _CACHE_LOCK:
+        _CACHE[key] = (time.monotonic(), result)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _CACHE_MAX_SIZE:
+            _CACHE.popitem(last=False)
+
 @dataclass
 class AIConfig:
     api_key: str
     base_url: str
     model: str
 
+def build_user_prompt(history: ChatHistory) -> str:
+    """Готовий user-промпт для агентів (будується один раз на чат, а не на кожного агента)"""
+    return (
+        "Проаналізуй і поверни JSON {'report': '...', 'confidence': 0-100}. \n\n"
+        f"ЧАТ: {history.chat_title}\nТЕКСТ:\n{history.text}"
+    )
+
 class Agent(Protocol):
     name: str
-    async def analyze(self, system_instructions: str, history: ChatHistory) -> Tuple[str, int]:
+    async def analyze(self, system_instructions: str, user_prompt: str) -> Tuple[str, int]:
         ...
 
 class PerplexitySonarAgent:
-    def __init__(self, api_key: str, model: str = "sonar"):
+    def __init__(self, api_key: str, model: str = "sonar", client: Optional[AsyncOpenAI] = None):
         self.name = "Perplexity"
-        self.client = AsyncOpenAI(api_key=api_key, base_url="https://api.perplexity.ai")
+        # Спільний пул з'єднань для всіх агентів (без нового TLS-рукостискання на кожен екземпляр)
+        self.client = client or get_perplexity_client(api_key)
         self.model = model
 
-    async def analyze(self, system_instructions: str, history: ChatHistory) -> Tuple[str, int]:
-        prompt = f"ЧАТ: {history.chat_title}\nТЕКСТ:\n{history.text}"
-        
-        resp = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_instructions},
-                {"role": "user", "content": f"Проаналізуй і поверни JSON {{'report': '...', 'confidence': 0-100}}. \n\n{prompt}"}
-            ],
-            temperature=0.2
-        )
-        return self._parse(resp.choices[0].message.content)
+    async def analyze(self, system_instructions: str, user_prompt: str) -> Tuple[str, int]:
+        key = _cache_key(self.model, system_instructions, user_prompt)
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.debug("[AI_CLIENT] [%s] Cache hit", self.name)
+            return cached
+
+        try:
+            # Слот тримаємо до кінця стріму - саме стільки запит "в польоті"
+            async with get_request_semaphore():
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_instructions},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.2,
+                    stream=True
+                )
+                text = await collect_completion_stream(stream)
+        except asyncio.CancelledError:
+            # Інший агент вже дав достатньо впевнену відповідь - HTTP-запит закривається разом зі стрімом
+            logger.debug("[AI_CLIENT] [%s] Analysis cancelled - consensus already reached", self.name)
+            raise
+        result = self._parse(text)
+        # Порожні/нерозпарсені відповіді не кешуємо - наступний запит спробує ще раз
+        if result[1] > 0:
+            _cache_put(key, result)
+        return result
 
     def _parse(self, text: str) -> Tuple[str, int]:
         try:
-            # Шукаємо JSON у відповіді (non-greedy to avoid capturing too much)
-            match = re.search(r'\{.*?\}', text, re.DOTALL)
-            if not match:
-                print(f"[AI_CLIENT] [WARNING] No JSON found in response. Returning text with 0 confidence.")
+            start = text.find("{")
+            if start < 0:
+                logger.warning("[AI_CLIENT] No JSON found in response. Returning text with 0 confidence.")
                 return text, 0
 
-            data = json.loads(match.group())
+            data = loads_json_object(text, start)
             confidence = data.get("confidence")
 
-            # Ensure confidence is an integer
-            if isinstance(confidence, str):
-                confidence = int(confidence)
-            elif confidence is None:
-                confidence = 50
-            else:
-                confidence = int(confidence)
+            # Ensure confidence is an integer (models sometimes return "85")
+            confidence = 50 if confidence is None else int(confidence)
 
             report = data.get("report", text)
-            print(f"[AI_CLIENT] [PARSE] Extracted confidence: {confidence}% from AI response")
+            logger.debug("[AI_CLIENT] [PARSE] Extracted confidence: %s%% from AI response", confidence)
             return report, confidence
 
         except json.JSONDecodeError as e:
-            print(f"[AI_CLIENT] [ERROR] JSON decode error: {e}. Returning text with 0 confidence.")
+            logger.error("[AI_CLIENT] JSON decode error: %s. Returning text with 0 confidence.", e)
             return text, 0
         except (ValueError, TypeError) as e:
-            print(f"[AI_CLIENT] [ERROR] Type conversion error: {e}. Returning text with 0 confidence.")
+            logger.error("[AI_CLIENT] Type conversion error: %s. Returning text with 0 confidence.", e)
             return text, 0
         except Exception as e:
-            print(f"[AI_CLIENT] [ERROR] Unexpected error in _parse: {e}. Returning text with 0 confidence.")
+            logger.error("[AI_CLIENT] Unexpected error in _parse: %s. Returning text with 0 confidence.", e)
             return text, 0
 
 class MultiAgentAnalyzer:
@@ -76,13 +200,34 @@ class MultiAgentAnalyzer:
 
     async def analyze_chat(self, system_instructions: str, history: ChatHistory):
         # ЗАПУСК КОНСИЛІУМУ (Паралельно)
-        results = await asyncio.gather(*[a.analyze(system_instructions, history) for a in self.agents])
-        
-        # Вибираємо результат з найвищою впевненістю
-        best_report, best_conf = max(results, key=lambda x: x[1])
-        
+        user_prompt = build_user_prompt(history)
+        best_report, best_conf = "", -1
+
+        # TaskGroup: якщо один агент впав - решта скасовується одразу, без "завислих" запитів
+        try:
+            async with asyncio.TaskGroup() as tg:
+                pending = {tg.create_task(a.analyze(system_instructions, user_prompt)) for a in self.agents}
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        # Помилку агента прокине сам TaskGroup
+                        if task.cancelled() or task.exception() is not None:
+                            continue
+                        report, conf = task.result()
+                        # Вибираємо результат з найвищою впевненістю
+                        if conf > best_conf:
+                            best_report, best_conf = report, conf
+                    # Достатньо впевнена відповідь - інших агентів не чекаємо
+                    if best_conf >= self.threshold:
+                        for task in pending:
+                            task.cancel()
+                        break
+        except ExceptionGroup as eg:
+            # Зберігаємо попередню поведінку: назовні летить помилка агента, а не група
+            raise eg.exceptions[0] from eg
+
         return {
             "report": best_report,
             "confidence": best_conf,
             "needs_review": best_conf < self.threshold
-        }
\ No newline at end of file
+        }
@@ -4,8 +4,11 @@ This module ensures single instance access to shared resources like DRAFT_BOT.
 """
 
 import asyncio
+import logging
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 # ============================================================================
 # GLOBAL STATE CONTAINER
 # ============================================================================
@@ -24,10 +27,10 @@ class AppState:
         self.draft_bot_instance = bot_instance
         if bot_instance:
             self.is_bot_online = True
-            print("[APP_STATE] ✓ Draft bot instance registered")
+            logger.info("[APP_STATE] ✓ Draft bot instance registered")
         else:
             self.is_bot_online = False
-            print("[APP_STATE] ✗ Draft bot instance cleared")
+            logger.info("[APP_STATE] ✗ Draft bot instance cleared")
 
     def get_draft_bot(self):
         """Get the global draft bot instance"""
@@ -39,7 +42,7 @@ class AppState:
         """Set the bot's event loop"""
         self.bot_event_loop = loop
         if loop:
-            print("[APP_STATE] ✓ Event loop registered")
+            logger.info("[APP_STATE] ✓ Event loop registered")
 
     def get_event_loop(self) -> Optional[asyncio.AbstractEventLoop]:
         """Get the bot's event loop"""
@@ -50,7 +53,7 @@ class AppState:
         self.draft_bot_instance = None
         self.bot_event_loop = None
         self.is_bot_online = False
-        print("[APP_STATE] ✓ State reset complete")
+        logger.info("[APP_STATE] ✓ State reset complete")
 
     def health_check(self) -> dict:
         """Get health status of the app"""
@@ -1,8 +1,52 @@
 import os
-from datetime import datetime, timezone, timedelta
+import re
+import logging
+import time
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timezone, timedelta
 from pathlib import Path
 from typing import Optional, Tuple
 from openai import AsyncOpenAI
+from ai_client import collect_completion_stream, loads_json_object
+from http_clients import get_perplexity_client, get_request_semaphore
+
+logger = logging.getLogger(__name__)
+
+# Скільки останніх символів історії потрапляє в промпт
+REPLY_HISTORY_CHARS = 1000
+
+_PROMPT_HEADER = """Ти - бізнес-асистент. На основі аналізу переписки та бізнес-даних, склади КОРОТКУ (2-4 речення) професійну відповідь клієнту.
+
+БІЗНЕС-ДАНІ:
+"""
+
+_PROMPT_TAIL_TEMPLATE = """
+
+ЧАТ: {chat_title}
+
+АНАЛІЗ ПЕРЕПИСКИ:
+{analysis_report}
+
+ОСТАННЯ ЧАСТИНА ІСТОРІЇ:
+{message_history_tail}
+
+ПРАВИЛА:
+1. Відповідь має бути природною, не копіюй текст з business_data дослівно
+2. Якщо клієнт запитує ціну - вкажи орієнтовну з business_data
+3. Якщо запитує термін - вкажи орієнтовний термін
+4. Завжди пропонуй наступний крок (дзвінок, зустріч, більше інфо)
+5. Тон: професійний, дружній, не офіційний
+6. Максимум 2-4 речення
+
+Поверни JSON:
+{{
+    "reply": "текст відповіді тут",
+    "confidence": 0-100,
+    "reasoning": "чому обрано такий варіант"
+}}
+"""
 
 def is_working_hours() -> bool:
     """
@@ -11,61 +55,101 @@ def is_working_hours() -> bool:
     Server runs in UTC, but clients are in Ukraine timezone.
     Automatically handles DST transitions.
     """
-    start = int(os.getenv("WORKING_HOURS_START", "9"))
-    end = int(os.getenv("WORKING_HOURS_END", "18"))
-
-    # Get current UTC time
-    now_utc = datetime.now(timezone.utc)
+    start, end = _working_hours_range()
 
     # Ukraine timezone offset: UTC+2 (winter) or UTC+3 (summer DST)
     # DST in Ukraine: last Sunday in March -> last Sunday in October
-    year = now_utc.year
-    march_last_sunday = _get_last_sunday_of_month(year, 3)
-    october_last_sunday = _get_last_sunday_of_month(year, 10)
+    now = time.time()
+    march_ts, october_ts = _dst_bounds(time.gmtime(now).tm_year)
+    ukraine_offset = 3 if march_ts <= now < october_ts else 2
 
-    if march_last_sunday <= now_utc.date() < october_last_sunday:
-        # DST period: UTC+3
-        ukraine_offset = timedelta(hours=3)
-    else:
-        # Standard time: UTC+2
-        ukraine_offset = timedelta(hours=2)
-
-    # Convert UTC to Ukraine time
-    now_ukraine = now_utc + ukraine_offset
-    current_hour = now_ukraine.hour
+    # Convert UTC to Ukraine hour
+    current_hour = (int(now) // 3600 + ukraine_offset) % 24
 
     return start <= current_hour < end
 
 
-def _get_last_sunday_of_month(year: int, month: int) -> datetime:
+@functools.lru_cache(maxsize=1)
+def _working_hours_range() -> Tuple[int, int]:
+    """Робочі години з .env (читаються при першому виклику, коли load_dotenv() вже відпрацював)"""
+    return int(os.getenv("WORKING_HOURS_START", "9")), int(os.getenv("WORKING_HOURS_END", "18"))
+
+
+@functools.lru_cache(maxsize=4)
+def _dst_bounds(year: int) -> Tuple[float, float]:
+    """Межі літнього часу для року як Unix timestamps (UTC-північ останніх неділь березня/жовтня)"""
+    march_last_sunday = _get_last_sunday_of_month(year, 3)
+    october_last_sunday = _get_last_sunday_of_month(year, 10)
+    return (
+        datetime.combine(march_last_sunday, dt_time(), tzinfo=timezone.utc).timestamp(),
+        datetime.combine(october_last_sunday, dt_time(), tzinfo=timezone.utc).timestamp(),
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_last_sunday_of_month(year: int, month: int) -> date:
     """Get the last Sunday of a given month (used for DST calculation)"""
     if month == 12:
         # If December, next month is January of next year
-        next_month_first = datetime(year + 1, 1, 1)
+        next_month_first = date(year + 1, 1, 1)
     else:
-        next_month_first = datetime(year, month + 1, 1)
+        next_month_first = date(year, month + 1, 1)
 
     # Go back to the last day of the target month
     last_day = next_month_first - timedelta(days=1)
 
     # Go back to the last Sunday
     days_since_sunday = (last_day.weekday() - 6) % 7  # 6 is Sunday
-    return (last_day - timedelta(days=days_since_sunday)).date()
+    return last_day - timedelta(days=days_since_sunday)
+
+_DEFAULT_BUSINESS_DATA = "Компанія: AIBI Solutions. Спеціалізуємося на AI-автоматизації."
+
+# Кеш business_data.txt: файл перечитується лише після зміни (за mtime)
+_BD_CACHE = {"mtime": 0.0, "text": ""}
+
 
 def load_business_data() -> str:
     """Завантажує бізнес-інформацію"""
     path = Path("business_data.txt")
-    if not path.exists():
-        return "Компанія: AIBI Solutions. Спеціалізуємося на AI-автоматизації."
-    return path.read_text(encoding="utf-8")
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return _DEFAULT_BUSINESS_DATA
+    if mtime != _BD_CACHE["mtime"]:
+        _BD_CACHE.update(mtime=mtime, text=path.read_text(encoding="utf-8"))
+    return _BD_CACHE["text"]
+
+@functools.lru_cache(maxsize=4)
+def _compile_out_of_scope(keywords: str) -> Optional["re.Pattern"]:
+    """Регулярка з OUT_OF_SCOPE_KEYWORDS (список через кому), None якщо список порожній"""
+    words = [w.strip() for w in keywords.split(",") if w.strip()]
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
+
+def _last_client_message(message_history: str) -> str:
+    """
+    Останнє повідомлення клієнта з історії ("[дата] [CLIENT] текст" рядками).
+
+    Історія без міток (draft_bot передає одне повідомлення) повертається як є.
+    """
+    idx = message_history.rfind("] [CLIENT] ")
+    if idx < 0:
+        return message_history
+    message = message_history[idx + len("] [CLIENT] "):]
+    end = message.find("\n[")  # наступний запис історії
+    return message if end < 0 else message[:end]
 
 class AutoReplyGenerator:
-    def __init__(self, ai_api_key: str):
-        self.client = AsyncOpenAI(
-            api_key=ai_api_key,
-            base_url="https://api.perplexity.ai"
-        )
-        self.business_data = load_business_data()
+    def __init__(self, ai_api_key: str, client: Optional[AsyncOpenAI] = None,
+                 business_data: Optional[str] = None):
+        self.client = client or get_perplexity_client(ai_api_key)
+        # Теми, якими бізнес не займається (напр. "WordPress") - відповідь без LLM
+        self._out_of_scope_re = _compile_out_of_scope(os.getenv("OUT_OF_SCOPE_KEYWORDS", ""))
+        # Бізнес-дані можна передати вже прочитаними (draft_bot читає їх поза event loop)
+        self.business_data = business_data if business_data is not None else load_business_data()
+        # Статична частина промпту з бізнес-даними збирається один раз
+        self._prompt_head = _PROMPT_HEADER + self.business_data
 
     async def generate_reply(
         self,
@@ -86,61 +170,48 @@ class AutoReplyGenerator:
             unreadable_message = "Kliyent nadislav fayl, yakiy ya ne mozhu prochytaty, tomu ya ne vidpoviv avtomatychno."
             return unreadable_message, 0
 
-        prompt = f"""Ти - бізнес-асистент. На основі аналізу переписки та бізнес-даних, склади КОРОТКУ (2-4 речення) професійну відповідь клієнту.
-
-БІЗНЕС-ДАНІ:
-{self.business_data}
-
-ЧАТ: {chat_title}
-
-АНАЛІЗ ПЕРЕПИСКИ:
-{analysis_report}
-
-ОСТАННЯ ЧАСТИНА ІСТОРІЇ:
-{message_history[-1000:]}
-
-ПРАВИЛА:
-1. Відповідь має бути природною, не копіюй текст з business_data дослівно
-2. Якщо клієнт запитує ціну - вкажи орієнтовну з business_data
-3. Якщо запитує термін - вкажи орієнтовний термін
-4. Завжди пропонуй наступний крок (дзвінок, зустріч, більше інфо)
-5. Тон: професійний, дружній, не офіційний
-6. Максимум 2-4 речення
-
-Поверни JSON:
-{{
-    "reply": "текст відповіді тут",
-    "confidence": 0-100,
-    "reasoning": "чому обрано такий варіант"
-}}
-"""
+        # OUT OF SCOPE: Запит не по нашому профілю - без LLM, нульова впевненість, одразу на ручний розгляд.
+        # Перевіряється лише останнє повідомлення клієнта: стара офтоп-фраза в історії не блокує нові запити
+        if self._out_of_scope_re and self._out_of_scope_re.search(_last_client_message(message_history)):
+            logger.debug("[AUTO_REPLY] Out-of-scope request in '%s' - skipping LLM", chat_title)
+            out_of_scope_message = "Zapyt klienta ne za profilem biznesu, tomu ya ne vidpoviv avtomatychno."
+            return out_of_scope_message, 0
+
+        # main.py передає вже обрізаний ChatHistory.tail(REPLY_HISTORY_CHARS) - він іде як є, ріжеться лише довший вхід
+        tail = (message_history if len(message_history) <= REPLY_HISTORY_CHARS
+                else message_history[-REPLY_HISTORY_CHARS:])
+        prompt = self._prompt_head + _PROMPT_TAIL_TEMPLATE.format(
+            chat_title=chat_title,
+            analysis_report=analysis_report,
+            message_history_tail=tail
+        )
 
         try:
-            resp = await self.client.chat.completions.create(
-                model="sonar",
-                messages=[
-                    {"role": "system", "content": "Ти - AI асистент для складання бізнес-відповідей."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-
-            result = self._parse_response(resp.choices[0].message.content)
+            async with get_request_semaphore():
+                stream = await self.client.chat.completions.create(
+                    model="sonar",
+                    messages=[
+                        {"role": "system", "content": "Ти - AI асистент для складання бізнес-відповідей."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    stream=True
+                )
+                text = await collect_completion_stream(stream)
+
+            result = self._parse_response(text)
             return result["reply"], result["confidence"]
 
         except Exception as e:
-            print(f"[ERROR] Помилка генерації відповіді: {e}")
+            logger.error("[AUTO_REPLY] Помилка генерації відповіді: %s", e)
             return "", 0
 
     def _parse_response(self, text: str) -> dict:
         """Парсить JSON відповідь"""
-        import re
-        import json
-
         try:
-            match = re.search(r'\{.*\}', text, re.DOTALL)
-            if match:
-                data = json.loads(match.group())
+            start = text.find("{")
+            if start >= 0:
+                data = loads_json_object(text, start)
                 return {
                     "reply": data.get("reply", ""),
                     "confidence": int(data.get("confidence", 0)),
@@ -152,30 +223,84 @@ class AutoReplyGenerator:
         return {"reply": "", "confidence": 0, "reasoning": "Parsing error"}
 
 class DraftReviewSystem:
-    def __init__(self):
-        self.pending_drafts = {}  # {chat_id: {"draft": text, "chat_title": str, "timestamp": datetime}}
+    """
+    Сховище чернеток, що очікують розгляду.
+
+    Обмежене за розміром (найстаріші витісняються) і за часом життя (TTL).
+    Доступ захищений threading.Lock: чернетки додає як цикл бота, так і
+    планувальник в окремому потоці.
+    """
 
-    def add_draft(self, chat_id: int, chat_title: str, draft_text: str, confidence: int):
+    def __init__(self, max_drafts: int = 10_000, ttl: timedelta = timedelta(hours=24)):
+        self.pending_drafts = OrderedDict()  # {chat_id: {"draft": text, "chat_title": str, "timestamp": datetime}}
+        self._lock = threading.Lock()
+        self._max = max_drafts
+        self._ttl = ttl
+
+    def add_draft(self, chat_id: int, chat_title: str, draft_text: str, confidence: int,
+                  original_message: str = ""):
         """Додає чернетку для розгляду"""
-        self.pending_drafts[chat_id] = {
-            "draft": draft_text,
-            "chat_title": chat_title,
-            "confidence": confidence,
-            "timestamp": datetime.now()
-        }
+        now = datetime.now()
+        with self._lock:
+            self.pending_drafts[chat_id] = {
+                "draft": draft_text,
+                "chat_title": chat_title,
+                "confidence": confidence,
+                "original_message": original_message,
+                "timestamp": now
+            }
+            self.pending_drafts.move_to_end(chat_id)
+
+            # Витісняємо найстаріші, якщо перевищено ліміт
+            while len(self.pending_drafts) > self._max:
+                self.pending_drafts.popitem(last=False)
+
+            # Видаляємо прострочені (найстаріші завжди на початку)
+            while self.pending_drafts:
+                oldest = next(iter(self.pending_drafts.values()))
+                if now - oldest["timestamp"] <= self._ttl:
+                    break
+                self.pending_drafts.popitem(last=False)
 
     def get_draft(self, chat_id: int) -> Optional[dict]:
         """Отримує чернетку по chat_id"""
-        return self.pending_drafts.get(chat_id)
+        with self._lock:
+            draft = self.pending_drafts.get(chat_id)
+            if draft and datetime.now() - draft["timestamp"] > self._ttl:
+                del self.pending_drafts[chat_id]
+                return None
+            return draft
+
+    def pop_draft(self, chat_id: int, draft_text: Optional[str] = None) -> Optional[dict]:
+        """
+        Забирає чернетку атомарно (пошук і видалення під одним lock) - None, якщо її немає або прострочена.
+
+        З draft_text забирає лише чернетку з таким текстом (новіша чернетка того ж чату лишається).
+        """
+        with self._lock:
+            draft = self.pending_drafts.get(chat_id)
+            if draft is None or (draft_text is not None and draft["draft"].strip() != draft_text.strip()):
+                return None
+            del self.pending_drafts[chat_id]
+        if draft and datetime.now() - draft["timestamp"] > self._ttl:
+            return None
+        return draft
+
+    def restore_draft(self, chat_id: int, draft: dict):
+        """Повертає забрану pop_draft чернетку (напр. відправка не вдалась), якщо новішої ще немає"""
+        with self._lock:
+            if chat_id not in self.pending_drafts:
+                self.pending_drafts[chat_id] = {**draft, "timestamp": datetime.now()}
 
     def remove_draft(self, chat_id: int):
         """Видаляє чернетку після обробки"""
-        if chat_id in self.pending_drafts:
-            del self.pending_drafts[chat_id]
+        with self._lock:
+            self.pending_drafts.pop(chat_id, None)
 
     def get_all_pending(self) -> dict:
         """Повертає всі чернетки, що очікують розгляду"""
-        return self.pending_drafts
+        with self._lock:
+            return dict(self.pending_drafts)
 
 # Глобальний екземпляр для зберігання чернеток
 draft_system = DraftReviewSystem()
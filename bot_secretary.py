@@ -1,4 +1,7 @@
 import os
+import uuid
+import asyncio
+import tempfile
 from telethon import TelegramClient, events
 from voice_handler import process_voice_message
 from dotenv import load_dotenv
@@ -20,17 +23,22 @@ async def start(event):
 async def handle_message(event):
     # Якщо прийшло голосове повідомлення
     if event.voice:
-        path = await event.download_media(file="voice_command.ogg")
+        # Унікальний файл на кожне повідомлення - паралельні голосові не перезаписують одне одного
+        target = os.path.join(tempfile.gettempdir(), f"voice_{uuid.uuid4().hex}.ogg")
+        path = await event.download_media(file=target)
         await event.respond("🎤 Обробляю твій голос...")
-        
-        text = process_voice_message(path)
-        
+
+        try:
+            # Розпізнавання синхронне - виносимо з event loop, щоб інші чати не чекали
+            text = await asyncio.to_thread(process_voice_message, path)
+        finally:
+            if path and os.path.exists(path):
+                await asyncio.to_thread(os.unlink, path)
+
         if text:
             await event.respond(f"✅ Додано нове правило:\n\"{text}\"")
         else:
             await event.respond("❌ Не вдалося розпізнати голос.")
-        
-        if os.path.exists(path): os.remove(path)
 
 async def send_notification(message):
     """Функція для відправки звіту тобі в чат"""
@@ -1,11 +1,13 @@
 import os
 import json
-import traceback
+import logging
 from datetime import datetime, timedelta
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
 class GoogleCalendarClient:
@@ -47,9 +49,7 @@ class GoogleCalendarClient:
             print(f"[ERROR] Make sure your credentials.json contains all required Service Account fields")
             raise
         except Exception as e:
-            print(f"[ERROR] Authentication failed:")
-            print(f"[ERROR] {type(e).__name__}: {e}")
-            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
+            logger.exception("[ERROR] Authentication failed: %s: %s", type(e).__name__, e)
             raise
 
     def create_event(self, summary: str, description: str, start_time: datetime, duration_minutes: int = 30, calendar_id: str = 'primary'):
@@ -84,9 +84,7 @@ class GoogleCalendarClient:
             return result
 
         except Exception as e:
-            print(f"[ERROR] Failed to create calendar event:")
-            print(f"[ERROR] {type(e).__name__}: {e}")
-            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
+            logger.exception("[ERROR] Failed to create calendar event: %s: %s", type(e).__name__, e)
             raise
 
     def create_reminder_from_report(self, chat_title: str, report: str, confidence: int, reminder_time: datetime):
@@ -99,7 +97,5 @@ class GoogleCalendarClient:
             return self.create_event(summary, description, reminder_time, duration_minutes=15)
 
         except Exception as e:
-            print(f"[ERROR] Failed to create reminder:")
-            print(f"[ERROR] {type(e).__name__}: {e}")
-            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
+            logger.exception("[ERROR] Failed to create reminder: %s: %s", type(e).__name__, e)
             raise
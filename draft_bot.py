@@ -5,17 +5,424 @@ FIXED: Proper entity fetching and event message handling.
 """
 
 import os
+import re
+import time
 import asyncio
-import traceback
+import functools
+import hashlib
+import logging
+import mmap
+import shutil
+import tempfile
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from telethon import TelegramClient, events
-from telethon.tl.types import Message
+from telethon import TelegramClient, events, functions
+from telethon.extensions import markdown
+from telethon.tl.types import Message, ReplyInlineMarkup, KeyboardButtonRow, TypeInputPeer
 from telethon.tl.custom.button import Button
-from auto_reply import draft_system
+from auto_reply import AutoReplyGenerator, draft_system
 from telegram_service import TelegramService
-from features.smart_enhancements import AutoBookingManager
+from features.smart_enhancements import AutoBookingManager, finance_exporter, has_meeting_hint
+from features.analytics_engine import run_unified_analytics
+from features.dynamic_instructions import get_instructions_manager
 from knowledge_base_storage import get_knowledge_base
+from calendar_client import GoogleCalendarClient
+from excel_module import get_excel_collector
+from voice_commands import get_voice_processor
+
+logger = logging.getLogger(__name__)
+
+# Вікно, за яке сповіщення власнику збираються в одне повідомлення
+NOTIFY_BATCH_WINDOW = 0.5  # секунд
+NOTIFY_BATCH_MAX = 20  # сповіщень за один прохід воркера (більше - зайвий розкид затримки)
+TELEGRAM_TEXT_LIMIT = 4096  # символів в одному повідомленні - довша пачка ділиться (див. _send_compound)
+
+# Кеш згенерованих чернеток для однакових повідомлень ("привіт", "ціна?")
+DRAFT_CACHE_MAX_SIZE = 512
+DRAFT_CACHE_TTL = 30 * 60  # секунд
+
+SENDER_NAME_CACHE_SIZE = 1024
+SEND_PEER_CACHE_SIZE = 1024
+BUTTON_MESSAGE_CACHE_SIZE = 256
+CARD_DRAFT_CACHE_SIZE = 1024  # (повідомлення, чат) -> чернетка, показана на цій картці
+
+# Кнопки дій під чернеткою: (підпис, префікс callback data)
+_BTN_SPECS = (
+    ("[OK] Send Response", b"send_"),
+    ("[EDIT] Edit Draft", b"edit_"),
+    ("[X] Ignore", b"skip_"),
+)
+# Callback data кнопок: b"<дія>_<chat_id>" - дія і число перевіряються одним проходом регулярки
+_CALLBACK_RE = re.compile(rb"([a-z]+)_(-?\d+)")
+# Короткі підписи для рядка чату в згрупованому сповіщенні
+_BTN_SHORT_LABELS = ("[OK] {n}", "[EDIT] {n}", "[X] {n}")
+
+
+def _make_action_buttons(sid: int) -> list:
+    """Send/Edit/Ignore для одного чату - на подію форматується лише callback data (вже bytes)"""
+    suffix = str(sid).encode()
+    (send_label, send_prefix), (edit_label, edit_prefix), (skip_label, skip_prefix) = _BTN_SPECS
+    return [
+        [Button.inline(send_label, send_prefix + suffix), Button.inline(edit_label, edit_prefix + suffix)],
+        [Button.inline(skip_label, skip_prefix + suffix)],
+    ]
+
+
+@functools.lru_cache(maxsize=1024)
+def _confirm_buttons(chat_id: int) -> list:
+    """Confirm & Send під відредагованою чернеткою (спільний об'єкт - не змінювати)"""
+    return [[Button.inline("[SEND] Confirm & Send", f"confirm_{chat_id}".encode())]]
+
+
+@functools.lru_cache(maxsize=1024)
+def _review_buttons(chat_id: int) -> list:
+    """Клавіатура send_draft_for_review (спільний об'єкт - не змінювати)"""
+    return [[
+        Button.inline("[OK] SEND NOW", f"send_{chat_id}".encode()),
+        Button.inline("📝 EDIT", f"edit_{chat_id}".encode()),
+        Button.inline("[ERROR] SKIP", f"skip_{chat_id}".encode()),
+    ]]
+
+
+# Розбір одиночного сповіщення (fallback, якщо картки вже немає в _card_drafts, напр. після рестарту)
+_NOTIFICATION_RE = re.compile(
+    r"NEW MESSAGE from (.+?) \(ID: (-?\d+)\)\n\nMESSAGE:\n(.*?)\n\nAI DRAFT:\n(.*?)(?:\n\nChoose action:|$)",
+    re.DOTALL
+)
+
+
+def _make_batch_row(n: int, sid: int) -> list:
+    """Рядок кнопок n-го чату у згрупованому сповіщенні"""
+    suffix = str(sid).encode()
+    return [
+        Button.inline(label.format(n=n), prefix + suffix)
+        for label, (_, prefix) in zip(_BTN_SHORT_LABELS, _BTN_SPECS)
+    ]
+
+# Клієнт відправки відповідей живе весь час роботи бота - з власною копією сесії користувача:
+# aibi_session.session (SQLite) відкривають fetch_chats_only / TelegramCollector ("database is locked")
+USER_SESSION_NAME = "aibi_session"
+SEND_SESSION_NAME = "aibi_session_sender"
+
+# Таймаути, щоб завислий виклик Telegram/аналізу не блокував бота
+STARTUP_NOTIFY_TIMEOUT = 10.0  # секунд
+CHECK_TIMEOUT = 180.0  # секунд
+STOP_DRAIN_TIMEOUT = 10.0  # секунд на відправку фонових повідомлень при зупинці
+
+# Скільки повідомлень власнику може бути в дорозі одночасно (частини пачки, сповіщення, підказки)
+OWNER_SEND_CONCURRENCY = 8
+
+# Повідомлення, на які чернетка не потрібна (LLM і сповіщення власнику пропускаються)
+MIN_DRAFT_TEXT_LEN = 3
+DRAFT_IGNORE_TOKENS = frozenset({"ok", "ок", "👍"})
+
+# Ліміт чернеток на одного відправника (token bucket): пачка з DRAFT_BURST, далі одна на DRAFT_REFILL секунд.
+# Флуд з групи чи від одного клієнта зберігається в реєстрі, але не запускає LLM і сповіщення власнику
+DRAFT_BURST = 3
+DRAFT_REFILL = 10.0  # секунд на один токен
+DRAFT_BUCKETS_MAX = 1024  # відправників, для яких пам'ятається стан ліміту (LRU)
+
+
+# ============================================================================
+# REPORT SCANNING
+# ============================================================================
+
+# Шукаємо по сирих байтах (UTF-8) - файли не декодуються і не копіюються в пам'ять
+# Поріг (>= 80) закладено в саму регулярку: число 80-99 або 100+ (з можливими нулями попереду),
+# тож підрахунок - це len(findall) без int() на кожен збіг
+_HIGH_CONF_RE = re.compile("ВПЕВНЕНІСТЬ ШІ:".encode("utf-8") + rb"\s*0*(?:[89]\d|[1-9]\d{2,})(?!\d)")
+# Обидва маркери одним проходом: пошук зупиняється на першому збігу, і без нього файл читається лише раз
+_DRAFT_MARKER_RE = re.compile(rb"DRAFT FOR REVIEW|AUTO-REPLY SENT")
+
+
+def _scan_reports_dir(reports_dir: str) -> tuple[int, int, int] | None:
+    """
+    Підраховує (total_reports, high_confidence_count, drafted_count) по *.txt у reports_dir.
+
+    Виконується в робочому потоці цілком - і лістинг каталогу, і читання файлів.
+    Кожен файл відображається через mmap, нечитабельні файли пропускаються.
+    None - якщо каталогу немає.
+    """
+    # scandir: DirEntry already knows name/type - no Path objects, no extra stat() per entry
+    try:
+        with os.scandir(reports_dir) as it:
+            report_files = [e.path for e in it if e.name.endswith(".txt") and e.is_file()]
+    except FileNotFoundError:
+        return None
+
+    high_confidence_count = 0
+    drafted_count = 0
+    for report_file in report_files:
+        try:
+            with open(report_file, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue  # mmap не відображає порожні файли
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Count high confidence reports ("ВПЕВНЕНІСТЬ ШІ: 85%")
+                    high_confidence_count += len(_HIGH_CONF_RE.findall(mm))
+                    # Count drafts sent
+                    if _DRAFT_MARKER_RE.search(mm):
+                        drafted_count += 1
+        except OSError as e:
+            logger.error("[ERROR] Error reading %s: %s", os.path.basename(report_file), e)
+    return len(report_files), high_confidence_count, drafted_count
+
+
+# ============================================================================
+# MESSAGE TEMPLATES
+# ============================================================================
+
+# Статичні тексти збираються один раз при імпорті - під час відправки форматуються лише змінні поля
+
+# Відповідь власнику при помилці команди - деталі (traceback) лише в лозі
+_GENERIC_ERROR_REPLY = "[ERROR] Command failed - see the bot log for details"
+
+_STARTUP_TEMPLATE = """
+[BOT] **SYSTEM RESTARTED**
+
+[OK] Bot is now ONLINE and ready to receive commands
+
+Status:
+  - Bot API: Connected
+  - Token: Valid
+  - Owner ID: {owner_id}
+  - Restart Time: {restart_time}
+
+Available Commands:
+  - /check: Manual analysis trigger
+  - /report: Analytics dashboard
+  - Звіт: Excel report export
+
+--------------------
+System is ready to process drafts and commands.
+""".strip()
+
+_DRAFT_REVIEW_TEMPLATE = """[BOT] **NEW DRAFT FOR REVIEW**
+
+**Chat**: {chat_title}
+**AI Confidence**: {confidence}%
+**Chat ID**: {chat_id}
+
+**PROPOSED RESPONSE:**
+{draft_text}
+
+--------------------
+**Choose action:**
+"""
+
+# Пункт згрупованого повідомлення з кількома чернетками (див. _send_review_batch)
+_REVIEW_ITEM_TEMPLATE = """{n}. **{chat_title}** (ID: {chat_id}) - AI Confidence: {confidence}%
+{draft_text}"""
+
+# Сповіщення власнику (формат розбирає _NOTIFICATION_RE - міняти узгоджено)
+_NOTIFICATION_TEMPLATE = "NEW MESSAGE from {name} (ID: {sid})\n\nMESSAGE:\n{text:.300}\n\nAI DRAFT:\n{draft}\n\nChoose action:"
+_BATCH_ITEM_TEMPLATE = "{n}. {name} (ID: {sid})\nMESSAGE:\n{text:.300}\nAI DRAFT:\n{draft}"
+
+# Замість чернетки в сповіщенні, коли ліміт DRAFT_BURST/DRAFT_REFILL пропустив LLM (Send для неї немає)
+_NO_DRAFT_TEXT = "[No AI draft - rate limit for this sender. Press Edit to reply]"
+
+_EDITED_DRAFT_TEMPLATE = """[EDITED DRAFT] for {chat_title} (ID: {chat_id})
+
+NEW TEXT:
+{new_text}
+
+Confirm to send this edited version:"""
+
+_EDIT_PROMPT = ("✍️ **I am listening. Please type the new response below:**\n\n"
+                "Send your edited message and I'll forward it to the client.")
+
+_CHECK_COMPLETE_TEMPLATE = """[OK] ANALYSIS COMPLETE
+
+[RESULT] {result}
+
+[NOTES]
+• All states cleared before analysis
+• Checked and processed recent messages
+• Drafts sent for any messages needing review
+• Check console for detailed debug output with [INPUT], [SMART_LOGIC], [ACTION] lines
+"""
+
+_FAQ_UPDATED_TEMPLATE = """✅ **Knowledge Base Updated!**
+
+📊 **Statistics:**
+• Total Successful Cases: {total_patterns}
+• Topics Identified: {topics_identified}
+• File: dynamic_instructions.txt
+
+🎯 **Impact:**
+The AI will now use these {total_patterns} successful patterns to:
+✓ Match your communication style
+✓ Provide consistent responses
+✓ Learn from approved replies
+
+📈 **Self-Learning Active:**
+Every time you click [Send], the AI learns and improves!
+"""
+
+_ANALYTICS_TEMPLATE = """[OK] UNIFIED ANALYTICS COMPLETE
+
+[DEALS]
+  Total: {total_deals}
+  Wins: {total_wins} ({win_rate:.1f}%)
+  Losses: {total_losses}
+  Unknown: {total_unknown}
+
+[REVENUE]
+  Total: ${total_revenue:,.2f}
+  Avg/Win: ${avg_win_revenue:,.2f}
+
+[CUSTOMERS]
+  Unique: {customer_count}
+
+[FORMAT BREAKDOWN]
+  Format A Wins: {format_a_wins}
+  Format A Losses: {format_a_losses}
+  Format B Wins: {format_b_wins}
+  Format B Losses: {format_b_losses}
+
+[TOP WINNING FAQs]"""
+
+_VIEW_INSTRUCTIONS_TEMPLATE = """[INFO] **CURRENT INSTRUCTIONS**
+
+**Core Instructions** ({instructions_size} chars):
+{core_preview}
+
+**Dynamic Rules** ({dynamic_size} chars):
+{dynamic_preview}
+
+**Backups Available**: {backup_count}
+
+Available Commands:
+  /update_instructions - Edit instructions
+  /list_backups - Show available backups
+  /rollback_backup - Restore from backup
+"""
+
+_UPDATE_INSTRUCTIONS_HELP = """[EDIT] **INSTRUCTIONS UPDATE MODE**
+
+Send your update in format:
+  REPLACE: [new instructions text]
+  APPEND: [text to add at end]
+  PREPEND: [text to add at beginning]
+  DYNAMIC: [new dynamic rule to add]
+  CANCEL: Cancel this operation
+
+Examples:
+  APPEND: Always mention 24/7 customer support availability
+  DYNAMIC: New rule: Check current system status before responding
+  REPLACE: [Full new instructions text here...]
+
+Note: Automatic backup will be created before changes.
+"""
+
+_ROLLBACK_USAGE = "Usage: /rollback_backup [filename]\nExample: /rollback_backup instructions_backup_20240215_120000.txt"
+
+_BACKUPS_TEMPLATE = """[BACKUP] **AVAILABLE BACKUPS** (Most recent first)
+
+{backups}
+
+{usage}"""
+
+_NO_PATTERNS_REPLY = ("⚠️ No successful patterns found yet!\n\n"
+                      "Approve some drafts first using the [Send] button, then try again.")
+
+_CHECK_STARTED_REPLY = ("[CHECK] Clearing states and triggering manual analysis of last 10 messages... "
+                        "This will take a moment...")
+
+# Префікс повідомлення -> режим update_instructions (None - DYNAMIC, окремий метод менеджера)
+_INSTRUCTION_MODES = {
+    "REPLACE": "replace",
+    "APPEND": "append",
+    "PREPEND": "prepend",
+    "DYNAMIC": None,
+}
+_INSTRUCTION_FORMAT_ERROR = ("[ERROR] Invalid format. Use "
+                             + "/".join(f"{head}:" for head in _INSTRUCTION_MODES) + "/CANCEL")
+
+
+# ============================================================================
+# LATE IMPORTS FROM main
+# ============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _from_main(name: str):
+    """
+    Об'єкт із main (BOT_REGISTRY, run_core_logic, ...), імпортований при першому зверненні.
+
+    main імпортує draft_bot, тож імпорт на рівні модуля був би циклічним; кеш прибирає
+    повторний import (блокування імпорту + пошук у sys.modules) на кожне повідомлення клієнта.
+    """
+    import main
+    return getattr(main, name)
+
+
+# ============================================================================
+# HANDLER WRAPPER
+# ============================================================================
+
+def _handler_safe(name: str):
+    """
+    Декоратор для Telethon-обробників: один try/except на вході замість обгорток у кожному.
+
+    Виняток логується разом із traceback (logger.exception) і не виходить у Telethon.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(event):
+            try:
+                return await fn(event)
+            except Exception:
+                logger.exception("[ERROR] %s handler failed", name)
+        return wrapper
+    return decorator
+
+
+# ============================================================================
+# FILE CACHE
+# ============================================================================
+
+# {Path: (st_mtime_ns, text, digest)} - business_data.txt / instructions.txt перечитуються лише при зміні,
+# digest (для ключів кешу чернеток) рахується один раз на перечитування
+_FILE_CACHE = {}
+
+
+async def _cached_read(path: Path) -> str:
+    """Read a text file once and re-read only when its mtime changes ("" if missing)"""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _FILE_CACHE.pop(path, None)
+        return ""
+
+    cached = _FILE_CACHE.get(path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+
+    # Читання з диска - поза event loop
+    text = await asyncio.to_thread(path.read_text, encoding='utf-8')
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+    _FILE_CACHE[path] = (mtime_ns, text, digest)
+    return text
+
+
+def _file_digest(path: Path) -> str:
+    """Content hash of the last _cached_read of path ("" if not cached)"""
+    cached = _FILE_CACHE.get(path)
+    return cached[2] if cached else ""
+
+
+def _copy_user_session():
+    """Свіжа копія aibi_session.session для клієнта відправки (авторизація і кеш сутностей)"""
+    shutil.copyfile(f"{USER_SESSION_NAME}.session", f"{SEND_SESSION_NAME}.session")
+
+
+def _user_session_mtime() -> int | None:
+    """mtime_ns файлу aibi_session.session (None, якщо файлу немає) - міняється при повторній авторизації"""
+    try:
+        return os.stat(f"{USER_SESSION_NAME}.session").st_mtime_ns
+    except FileNotFoundError:
+        return None
 
 
 # ============================================================================
@@ -34,46 +441,127 @@ class DraftReviewBot:
         self.api_hash = api_hash
         self.bot_token = bot_token
         self.owner_id = owner_id
+        # Read once - the bot is created after load_dotenv(), not per AI draft
+        self._ai_api_key = os.getenv("AI_API_KEY")
         self.session_name = "draft_bot_api"
         self.client = None
+        # Long-lived user-session client for sending replies to clients (see _get_send_client)
+        self._send_client = None
+        self._send_client_lock = asyncio.Lock()
+        # mtime of the aibi_session copy the send client was built from, and of the last copy found
+        # unauthorized - until the file changes, no connect is attempted (see _get_send_client)
+        self._send_session_mtime = None
+        self._unauthorized_session_mtime = None
+        # {chat_id: InputPeer} resolved through _send_client - LRU, repeat sends skip peer resolution
+        self._peer_cache: OrderedDict[int, TypeInputPeer] = OrderedDict()
+        # {message_id: Message} - our messages with inline buttons, so a click doesn't re-fetch them (LRU)
+        self._button_messages: OrderedDict[int, Message] = OrderedDict()
+        # {(message_id, chat_id): (chat_title, original_message, draft_text)} - the draft each card shows.
+        # draft_system keeps only the newest draft per chat; Send on an older card must send what it shows
+        self._card_drafts: OrderedDict[tuple[int, int], tuple[str, str, str]] = OrderedDict()
+        # Chats with a Send/Confirm in progress - a double-tap is answered, not sent twice
+        self._inflight_sends: set[int] = set()
+        # Post-send enhancements (KB capture, auto-booking) running in the background
+        self._background_tasks: set[asyncio.Task] = set()
+        # Caps concurrent sends to the owner (see _bounded_send); binds to the loop on first use
+        self._send_sem = asyncio.Semaphore(OWNER_SEND_CONCURRENCY)
         self.tg_service = TelegramService(
             api_id,
             api_hash,
             bot_token,
             session_name="draft_bot_service"
         )
-        self.waiting_for_edit = {}  # {chat_id: True} - waiting for edit
-        self.check_in_progress = False  # Prevent duplicate /check commands
+        # Chat whose draft the owner is editing - one owner, so one edit at a time;
+        # pressing Edit on another draft switches to it
+        self._awaiting_edit_chat: int | None = None
+        self.pending_edits: dict[int, str] = {}  # {chat_id: edited text} awaiting Confirm & Send
+        self._edit_cards: dict[int, int] = {}  # {chat_id: id of the card whose Edit was pressed}
+        self._check_lock = asyncio.Lock()  # Prevent duplicate /check commands
+        self._instructions_lock = asyncio.Lock()  # One instructions.txt write (and backup) at a time
         self.waiting_for_instructions = False  # NEW: Track instruction update state
         self.connection_attempts = 0
         self.max_connection_attempts = 3
+        # Owner notifications are batched by background workers (see _batch_worker):
+        # new client messages (_notify_*) and drafts from the core analysis (_review_*)
+        self._loop = None
+        self._notify_queue = None
+        self._notify_task = None
+        self._review_queue = None
+        self._review_task = None
+        # {key: (timestamp, draft_text)} - LRU cache of AI drafts for repeated messages
+        self._draft_cache = OrderedDict()
+        # {sender_id: display name} - LRU, the same users write again and again
+        self._sender_name_cache = OrderedDict()
+        # {sender_id: (tokens, last_refill)} - LRU, per-sender draft rate limit (see _take_draft_token)
+        self._draft_buckets = OrderedDict()
+
+        # Inline button dispatch, keyed by the callback data prefix (bytes, as Telethon delivers it)
+        self._callbacks = {
+            b"send": self._on_send,
+            b"confirm": self._on_confirm,
+            b"edit": self._on_edit,
+            b"skip": self._on_skip,
+        }
+
+        # Owner command dispatch, keyed by the first token (casefolded)
+        self._commands = {
+            "/check": self._cmd_check,
+            "/export": self._cmd_export,
+            "/report": self._cmd_report,
+            "/generate_faq": self._cmd_generate_faq,
+            "/analytics": self._cmd_analytics,
+            "/view_instructions": self._cmd_view_instructions,
+            "/list_backups": self._cmd_list_backups,
+            "/update_instructions": self._cmd_update_instructions,
+            "/rollback_backup": self._cmd_rollback_backup,
+        }
 
     async def start(self):
         """Start bot with auto-recovery on auth errors"""
-        print(f"[DRAFT BOT] Starting bot...")
+        logger.info("[DRAFT BOT] Starting bot...")
 
         # Connect using TelegramService
         if not await self.tg_service.connect():
-            print("[ERROR] Failed to connect via TelegramService")
+            logger.error("[ERROR] Failed to connect via TelegramService")
             return False
 
         # Use the service's connected client
         self.client = self.tg_service.client
 
-        print("[DRAFT BOT] [OK] Bot authenticated with Bot API (stable mode)")
-        print(f"[DRAFT BOT] Bot token ends with: ...{self.bot_token[-10:]}")
+        # Python 3.12+: tasks run synchronously up to their first await - background sends,
+        # prefetches and post-send jobs skip one loop iteration each
+        if hasattr(asyncio, "eager_task_factory"):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+        logger.info("[DRAFT BOT] [OK] Bot authenticated with Bot API (stable mode)")
+        logger.info("[DRAFT BOT] Bot token ends with: ...%s", self.bot_token[-10:])
 
         # Register handlers
         self._register_button_handler()
-        self._register_command_handler()
-        self._register_text_message_handler()
-        self._register_new_message_handler()
-        self._register_voice_handler()  # NEW: Phase 3 - Voice Integration
+        self._register_message_handler()  # commands, voice (Phase 3) and client messages
 
-        print("[DRAFT BOT] Started - listening for commands, buttons, messages, and VOICE...")
+        # Start owner notification batching
+        self._loop = asyncio.get_running_loop()
+        self._notify_queue = asyncio.Queue()
+        self._notify_task = asyncio.create_task(
+            self._batch_worker(self._notify_queue, self._send_notification_batch)
+        )
+        self._review_queue = asyncio.Queue()
+        self._review_task = asyncio.create_task(
+            self._batch_worker(self._review_queue, self._send_review_batch)
+        )
+
+        # Connect the send client now so the first Send button does not pay the handshake
+        try:
+            await self._get_send_client()
+        except Exception as e:
+            logger.warning("[DRAFT BOT] [DIRECT SEND] Send client not ready yet: %s", e)
 
-        # Send startup notification to owner
-        await self.send_startup_notification()
+        logger.info("[DRAFT BOT] Started - listening for commands, buttons, messages, and VOICE...")
+
+        # Startup notification goes out in the background - start() doesn't wait for its round-trip
+        # (send_startup_notification logs its own failures and times out after STARTUP_NOTIFY_TIMEOUT)
+        self._spawn_background(self.send_startup_notification())
 
         self.connection_attempts = 0
         return True
@@ -84,45 +572,33 @@ class DraftReviewBot:
 
     async def send_startup_notification(self):
         """Send system restart notification to owner"""
-        from datetime import datetime
-
         if self.owner_id == 0 or self.owner_id is None:
-            print("[WARNING] OWNER_TELEGRAM_ID not set - skipping startup notification")
+            logger.warning("[WARNING] OWNER_TELEGRAM_ID not set - skipping startup notification")
             return
 
-        startup_message = f"""
-[BOT] **SYSTEM RESTARTED**
-
-[OK] Bot is now ONLINE and ready to receive commands
-
-Status:
-  - Bot API: Connected
-  - Token: Valid
-  - Owner ID: {self.owner_id}
-  - Restart Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-Available Commands:
-  - /check: Manual analysis trigger
-  - /report: Analytics dashboard
-  - Звіт: Excel report export
-
---------------------
-System is ready to process drafts and commands.
-"""
+        startup_message = _STARTUP_TEMPLATE.format(
+            owner_id=self.owner_id,
+            restart_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
 
         try:
-            success = await self.tg_service.send_message(
-                recipient_id=self.owner_id,
-                text=startup_message.strip()
+            success = await asyncio.wait_for(
+                self._bounded_send(
+                    recipient_id=self.owner_id,
+                    text=startup_message
+                ),
+                timeout=STARTUP_NOTIFY_TIMEOUT
             )
 
             if success:
-                print(f"[DRAFT BOT] [OK] Startup notification sent to owner ({self.owner_id})")
+                logger.info("[DRAFT BOT] [OK] Startup notification sent to owner (%s)", self.owner_id)
             else:
-                print(f"[DRAFT BOT] [ERROR] Failed to send startup notification")
+                logger.error("[DRAFT BOT] [ERROR] Failed to send startup notification")
 
+        except asyncio.TimeoutError:
+            logger.error("[ERROR] Startup notification timed out after %ss", STARTUP_NOTIFY_TIMEOUT)
         except Exception as e:
-            print(f"[ERROR] Error sending startup notification: {e}")
+            logger.error("[ERROR] Error sending startup notification: %s", e)
 
     # ========================================================================
     # EVENT HANDLERS
@@ -130,204 +606,144 @@ System is ready to process drafts and commands.
 
     def _register_button_handler(self):
         """Register callback query handler for inline buttons"""
-        # FIX: CallbackQuery doesn't accept from_users parameter
-        # Instead, filter by sender_id inside the handler
-        @self.client.on(events.CallbackQuery())
-        async def button_handler(event):
-            try:
-                # Security: Only process callbacks from owner
-                if event.sender_id != self.owner_id:
-                    print(f"[SECURITY] Ignoring callback from non-owner: {event.sender_id}")
-                    await event.answer("Unauthorized", alert=True)
-                    return
-
-                await self.handle_button_callback(event)
-            except Exception as e:
-                print(f"[ERROR] Button handler exception: {type(e).__name__}: {e}")
-                try:
-                    await event.answer(f"Error: {type(e).__name__}")
-                except:
-                    pass
+        # CallbackQuery has no from_users, but buttons live in the owner's private chat with
+        # the bot - chats=owner_id lets Telethon drop everything else before the handler runs
+        # handle_button_callback answers the owner on errors itself
+        self.client.add_event_handler(
+            _handler_safe("button")(self.handle_button_callback),
+            events.CallbackQuery(chats=self.owner_id)
+        )
 
-    def _register_command_handler(self):
-        """Register handler for bot commands (/export, /check)"""
-        @self.client.on(events.NewMessage(from_users=self.owner_id, pattern=r'^/'))
-        async def command_handler(event):
-            try:
-                command = event.message.text.strip().lower()
-                print(f"[COMMAND] Received command: {command}")
-
-                if command == '/check':
-                    # Prevent duplicate execution
-                    if self.check_in_progress:
-                        await event.reply("[WAIT] Analysis already in progress, please wait...")
-                        print("[DRAFT BOT] [CHECK] Ignoring duplicate command - analysis already running")
-                        return
-
-                    self.check_in_progress = True
-                    try:
-                        await event.reply("[OK] Manual analysis triggered via /check command")
-                        print("[DRAFT BOT] Manual /check command received from owner")
-                        print("[DRAFT BOT] Clearing any waiting states before analysis...")
-                        self.waiting_for_edit.clear()
-                        print(f"[DRAFT BOT] Waiting states cleared: {len(self.waiting_for_edit)} items removed")
-
-                        # Trigger analysis - pass bot instance directly
-                        from main import run_core_logic
-                        print("[DRAFT BOT] [CHECK] Starting run_core_logic() to reanalyze recent messages...")
-                        await run_core_logic(draft_bot_param=self)  # Pass bot by reference
-                        print("[DRAFT BOT] [CHECK] Analysis completed")
-                    finally:
-                        self.check_in_progress = False
-
-                elif command == '/export':
-                    await event.reply("[PROCESSING] Generating finance export... Please wait.")
-                    print("[FINANCE EXPORT] Command received from owner")
-
-                    # Generate finance report
-                    try:
-                        from features.smart_enhancements import finance_exporter
-                        from main import fetch_chats_only
-
-                        # Fetch recent chats
-                        chats = await fetch_chats_only(limit=100, hours_ago=168)  # Last week
-
-                        # Generate Excel report
-                        excel_path = finance_exporter.generate_excel_report(chats, [])
-
-                        if excel_path and os.path.exists(excel_path):
-                            await self.client.send_file(
-                                self.owner_id,
-                                excel_path,
-                                caption="[SUCCESS] Finance Export Report"
-                            )
-                            print(f"[FINANCE EXPORT] [SUCCESS] Report sent: {excel_path}")
-                        else:
-                            await event.reply("[ERROR] Failed to generate report")
-                            print("[FINANCE EXPORT] [ERROR] Excel file not created")
-
-                    except Exception as export_error:
-                        await event.reply(f"[ERROR] Export failed: {export_error}")
-                        print(f"[FINANCE EXPORT] [ERROR] {export_error}")
-                        print(f"[FINANCE EXPORT] Traceback:\n{traceback.format_exc()}")
+    def _register_message_handler(self):
+        """
+        Register ONE NewMessage handler for all incoming messages.
 
+        Routing by sender inside the handler instead of three separate
+        NewMessage builders - Telethon runs each message through one filter.
+        """
+        @self.client.on(events.NewMessage(incoming=True))
+        @_handler_safe("message")
+        async def message_handler(event):
+            sender_id = event.sender_id
+            if sender_id == self.owner_id:
+                message = event.message
+                if message.voice or message.audio:
+                    await self._handle_owner_voice(event)
                 else:
-                    print(f"[COMMAND] Unknown command: {command}")
+                    await self._handle_owner_text(event)
+            elif sender_id == 777000:  # Telegram notification ID
+                return
+            else:
+                await self._handle_client_message(event)
 
-            except Exception as e:
-                print(f"[ERROR] Command handler exception: {type(e).__name__}: {e}")
-                try:
-                    await event.reply(f"[ERROR] {type(e).__name__}: {e}")
-                except:
-                    pass
+    async def _handle_client_message(self, event):
+        """Incoming message from a client: store it for the Web UI and prepare an AI draft for the owner"""
+        # Channels and bots never get a draft - nothing to store either
+        if event.is_channel or getattr(event.message.sender, "bot", False):
+            return
 
-    def _register_new_message_handler(self):
-        """Register handler for new messages from all users (for forwarding to analysis)"""
-        @self.client.on(events.NewMessage(incoming=True))
-        async def new_message_handler(event):
-            try:
-                # Skip messages from owner (handled by text handler)
-                if event.sender_id == self.owner_id:
-                    return
+        # Synchronous checks first: stickers, "ok" and floods are stored below but never drafted,
+        # so they skip the prompt files entirely (and with a cached name - every await).
+        # The rate limit covers only the LLM call - a flooding client's messages still reach the owner
+        needs_draft = bool(self.owner_id) and self._needs_draft(event.message.text)
+        wants_draft = needs_draft and self._take_draft_token(event.sender_id)
+
+        if wants_draft:
+            # Sender lookup (network) and prompt files (disk) are independent - fetch them together
+            sender_name, business_data, instructions = await asyncio.gather(
+                self._get_sender_name(event),
+                _cached_read(Path("business_data.txt")),
+                _cached_read(Path("instructions.txt"))
+            )
+        else:
+            sender_name = await self._get_sender_name(event)
 
-                # Skip bot messages
-                if event.sender_id == 777000:  # Telegram notification ID
-                    return
+        # Log incoming message
+        message_text = event.message.text or "[Non-text message]"
+        # One slice for every preview: registry and notification queue (500), log (100), notification text (300)
+        preview = message_text[:500]
 
-                # Log incoming message
-                sender = await event.get_sender()
-                sender_name = sender.first_name if hasattr(sender, 'first_name') else str(sender.id)
-                message_text = event.message.text or "[Non-text message]"
+        logger.debug("[DRAFT BOT] [NEW MESSAGE] From %s (ID: %s): %.100s", sender_name, event.sender_id, preview)
 
-                print(f"[DRAFT BOT] [NEW MESSAGE] From {sender_name} (ID: {event.sender_id}): {message_text[:100]}")
+        # Store message in registry for Web UI display
+        try:
+            chat_id = event.chat_id if hasattr(event, 'chat_id') else event.sender_id
+            message_data = {
+                "message_id": event.id,
+                "chat_id": chat_id,
+                "sender_id": event.sender_id,
+                "sender_name": sender_name,
+                "text": preview,  # Store preview
+                "date": event.date.isoformat() if hasattr(event, 'date') else datetime.now().isoformat()
+            }
+            _from_main("BOT_REGISTRY").add_message(chat_id, message_data)
+        except Exception as e:
+            logger.warning("[WARNING] Failed to store message in registry: %s", e)
 
-                # Store message in registry for Web UI display
-                try:
-                    from main import BOT_REGISTRY
-                    chat_id = event.chat_id if hasattr(event, 'chat_id') else event.sender_id
-                    message_data = {
-                        "message_id": event.id,
-                        "chat_id": chat_id,
-                        "sender_id": event.sender_id,
-                        "sender_name": sender_name,
-                        "text": message_text[:500],  # Store preview
-                        "date": event.date.isoformat() if hasattr(event, 'date') else datetime.now().isoformat()
-                    }
-                    BOT_REGISTRY.add_message(chat_id, message_data)
-                except Exception as e:
-                    print(f"[WARNING] Failed to store message in registry: {e}")
-
-                # INTERACTIVE MANAGER MODE: Generate AI draft and send with action buttons
-                if self.owner_id and event.sender_id != self.owner_id:
-                    try:
-                        # Generate AI draft using auto_reply system
-                        print(f"[DRAFT BOT] [AI DRAFT] Generating response for chat {event.sender_id}...")
-
-                        # Load business data and instructions
-                        business_data_path = Path("business_data.txt")
-                        instructions_path = Path("instructions.txt")
-
-                        business_data = ""
-                        instructions = ""
-
-                        if business_data_path.exists():
-                            business_data = business_data_path.read_text(encoding='utf-8')
-
-                        if instructions_path.exists():
-                            instructions = instructions_path.read_text(encoding='utf-8')
-
-                        # Generate AI draft
-                        try:
-                            draft_text = await draft_system.generate_reply(
-                                message_text=message_text,
-                                business_data=business_data,
-                                instructions=instructions,
-                                chat_title=sender_name
-                            )
-                            print(f"[DRAFT BOT] [AI DRAFT] Generated {len(draft_text)} chars")
-                        except Exception as draft_error:
-                            print(f"[DRAFT BOT] [AI DRAFT] Generation failed: {draft_error}")
-                            draft_text = "[AI draft generation failed - respond manually]"
-
-                        # Create notification with AI draft and interactive buttons
-                        notification = (
-                            f"NEW MESSAGE from {sender_name} (ID: {event.sender_id})\n\n"
-                            f"MESSAGE:\n{message_text[:300]}\n\n"
-                            f"AI DRAFT:\n{draft_text}\n\n"
-                            f"Choose action:"
-                        )
-
-                        # Create inline buttons for interactive management
-                        buttons = [
-                            [
-                                Button.inline("[OK] Send Response", f"send_{event.sender_id}"),
-                                Button.inline("[EDIT] Edit Draft", f"edit_{event.sender_id}"),
-                            ],
-                            [
-                                Button.inline("[X] Ignore", f"skip_{event.sender_id}"),
-                            ]
-                        ]
-
-                        # Send notification with buttons
-                        await self.tg_service.send_message(
-                            recipient_id=self.owner_id,
-                            text=notification,
-                            buttons=buttons
-                        )
-
-                        print(f"[DRAFT BOT] [INTERACTIVE] Sent notification to owner with 3 action buttons")
-
-                    except Exception as e:
-                        print(f"[WARNING] Failed to send interactive notification: {e}")
-                        import traceback
-                        traceback.print_exc()
+        # Stickers, media without caption, "ok" - stored above, but not worth an LLM call
+        if not needs_draft:
+            logger.debug("[DRAFT BOT] [AI DRAFT] Skipped trivial message from %s", event.sender_id)
+            return
+        if not wants_draft:
+            # Rate-limited: no LLM call, but the owner is still notified (draft None - see _send_notification_batch)
+            logger.debug("[DRAFT BOT] [AI DRAFT] Rate-limited %s - notifying without a draft", event.sender_id)
+            self._notify_queue.put_nowait((event.sender_id, sender_name, preview, None))
+            return
 
-            except Exception as e:
-                print(f"[ERROR] New message handler exception: {type(e).__name__}: {e}")
+        # INTERACTIVE MANAGER MODE: Generate AI draft and send with action buttons
+        try:
+            # Generate AI draft using auto_reply system
+            logger.debug("[DRAFT BOT] [AI DRAFT] Generating response for chat %s...", event.sender_id)
+
+            # Resolve the client's peer on the send client while the LLM works - Send won't wait for it
+            self._spawn_background(self._warm_send_peer(event.sender_id))
 
-    def _register_voice_handler(self):
+            # Generate AI draft
+            try:
+                draft_text = await self._generate_draft(message_text, sender_name, instructions, business_data)
+                logger.debug("[DRAFT BOT] [AI DRAFT] Generated %s chars", len(draft_text))
+            except Exception as draft_error:
+                logger.warning("[DRAFT BOT] [AI DRAFT] Generation failed: %s", draft_error)
+                draft_text = "[AI draft generation failed - respond manually]"
+
+            # Keep the draft so Send/Edit work even when notifications are batched
+            draft_system.add_draft(
+                chat_id=event.sender_id,
+                chat_title=sender_name,
+                draft_text=draft_text,
+                confidence=0,
+                original_message=message_text
+            )
+
+            # Queue the owner notification - the worker batches bursts into one message
+            self._notify_queue.put_nowait((event.sender_id, sender_name, preview, draft_text))
+            logger.debug("[DRAFT BOT] [INTERACTIVE] Notification queued for owner")
+
+        except Exception as e:
+            logger.warning("[WARNING] Failed to send interactive notification: %s", e, exc_info=True)
+
+    def _take_draft_token(self, sender_id: int) -> bool:
+        """Token bucket per sender: True if this message may get an AI draft (no awaits, O(1))"""
+        now = time.monotonic()
+        tokens, last = self._draft_buckets.pop(sender_id, (DRAFT_BURST, now))
+        tokens = min(DRAFT_BURST, tokens + (now - last) / DRAFT_REFILL)
+        allowed = tokens >= 1
+        self._draft_buckets[sender_id] = (tokens - 1 if allowed else tokens, now)
+        if len(self._draft_buckets) > DRAFT_BUCKETS_MAX:
+            self._draft_buckets.popitem(last=False)
+        return allowed
+
+    @staticmethod
+    def _needs_draft(text: str) -> bool:
+        """Чи варте повідомлення чернетки (дешева перевірка до виклику LLM)"""
+        if not text:
+            return False
+        text = text.strip()
+        return len(text) >= MIN_DRAFT_TEXT_LEN and text.casefold() not in DRAFT_IGNORE_TOKENS
+
+    async def _handle_owner_voice(self, event):
         """
-        Register handler for voice messages/audio files - Phase 3: Voice Integration
+        Voice messages/audio files from the owner - Phase 3: Voice Integration
 
         SECURITY: Only processes voice from owner (ID: 8040716622)
 
@@ -335,477 +751,398 @@ System is ready to process drafts and commands.
         - "Звіт" or "Експорт" → Generate Excel report
         - "Напиши [Ім'я]" → Generate draft for client
         """
-        @self.client.on(events.NewMessage(from_users=self.owner_id))
-        async def voice_handler(event):
+        try:
+            # Router already checked that this is a voice/audio message
+            message = event.message
+
+            logger.info("[VOICE] 🎤 Voice message received from owner (ID: %s)", self.owner_id)
+
+            # Send acknowledgment
+            await event.reply("🎤 [VOICE] Processing your voice command...")
+
+            # Download voice/audio file
+            temp_dir = Path(tempfile.gettempdir())
+            voice_file = temp_dir / f"voice_{event.id}.ogg"
+
+            logger.info("[VOICE] Downloading audio file...")
+            await message.download_media(file=str(voice_file))
+            logger.info("[VOICE] ✓ Downloaded to: %s", voice_file)
+
+            # Transcribe using Whisper
+            voice_processor = get_voice_processor(self.owner_id)
+
+            if not voice_processor.whisper_model:
+                await event.reply("❌ [VOICE] Whisper not available. Install: pip install openai-whisper")
+                return
+
+            transcribed_text = await voice_processor.transcribe_voice_message(str(voice_file))
+
+            # Clean up temp file
             try:
-                # Check if message contains voice or audio
-                message = event.message
+                voice_file.unlink()
+            except:
+                pass
 
-                # Check for voice message
-                if not message.voice and not message.audio:
-                    return  # Not a voice/audio message
+            if not transcribed_text:
+                await event.reply("❌ [VOICE] Failed to transcribe audio")
+                return
 
-                print(f"\n{'='*80}")
-                print(f"[VOICE] 🎤 Voice message received from owner (ID: {self.owner_id})")
-                print(f"{'='*80}")
+            # Send transcription confirmation
+            await event.reply(f"✅ [VOICE] Transcribed: \"{transcribed_text}\"")
 
-                # Send acknowledgment
-                await event.reply("🎤 [VOICE] Processing your voice command...")
+            # Recognize command
+            command_result = voice_processor.recognize_command(transcribed_text)
 
-                # Download voice/audio file
-                import tempfile
-                from pathlib import Path
+            command_type = command_result["command"]
 
-                temp_dir = Path(tempfile.gettempdir())
-                voice_file = temp_dir / f"voice_{event.id}.ogg"
+            if command_type == "report":
+                # Execute Excel report command
+                logger.info("[VOICE] Executing REPORT command...")
+                await voice_processor.execute_report_command(event, self)
 
-                print(f"[VOICE] Downloading audio file...")
-                await message.download_media(file=str(voice_file))
-                print(f"[VOICE] ✓ Downloaded to: {voice_file}")
+            elif command_type == "draft":
+                # Execute draft generation command
+                client_name = command_result["params"]["client_name"]
+                logger.info("[VOICE] Executing DRAFT command for '%s'...", client_name)
+                await voice_processor.execute_draft_command(event, self, client_name)
 
-                # Transcribe using Whisper
-                from voice_commands import get_voice_processor
+            else:
+                # Unknown command
+                await event.reply(
+                    f"❓ [VOICE] Unknown command.\n\n"
+                    f"Supported commands:\n"
+                    f"• 'Звіт' or 'Експорт' - Generate Excel report\n"
+                    f"• 'Напиши [Ім'я]' - Generate draft for client"
+                )
 
-                voice_processor = get_voice_processor(self.owner_id)
+        except Exception as e:
+            logger.exception("[VOICE] [ERROR] %s: %s", type(e).__name__, e)
+            try:
+                await event.reply(_GENERIC_ERROR_REPLY)
+            except:
+                pass
 
-                if not voice_processor.whisper_model:
-                    await event.reply("❌ [VOICE] Whisper not available. Install: pip install openai-whisper")
-                    return
+    async def _handle_owner_text(self, event):
+        """Owner text: commands, instructions update and edit replies"""
+        raw_text = event.raw_text
+        # Every command starts with "/" - other messages skip tokenizing entirely.
+        # Command = first token; one O(1) lookup instead of an if/elif chain
+        if raw_text.startswith("/"):
+            command = self._commands.get(raw_text.split(None, 1)[0].casefold())
+            if command:
+                await command(event, event.message.text or "")
+                return
 
-                transcribed_text = await voice_processor.transcribe_voice_message(str(voice_file))
+        # ================================================================
+        # HANDLE: Edit text replies (most frequent after commands - checked first;
+        # a client reply that mentions "звіт" must not start an Excel export)
+        # ================================================================
+        if self._awaiting_edit_chat is not None:
+            await self._safe_execute(
+                self.handle_edit_text(event),
+                "edit text"
+            )
+            return
 
-                # Clean up temp file
-                try:
-                    voice_file.unlink()
-                except:
-                    pass
+        message_text = event.message.text or ""
 
-                if not transcribed_text:
-                    await event.reply("❌ [VOICE] Failed to transcribe audio")
-                    return
+        # ================================================================
+        # HANDLE: Instructions update processing
+        # ================================================================
+        if self.waiting_for_instructions and message_text:
+            await self._handle_instructions_update(event, message_text)
 
-                # Send transcription confirmation
-                await event.reply(f"✅ [VOICE] Transcribed: \"{transcribed_text}\"")
+        # Excel export for Звіт (substring match) - only outside the input modes above
+        elif "звіт" in message_text.casefold():
+            await self._cmd_excel_report(event, message_text)
 
-                # Recognize command
-                command_result = voice_processor.recognize_command(transcribed_text)
+    # ========================================================================
+    # OWNER COMMANDS
+    # ========================================================================
 
-                command_type = command_result["command"]
+    async def _cmd_check(self, event, message_text: str):
+        """/check - Manual analysis trigger"""
+        # Prevent duplicate execution (repeated taps must not start overlapping analyses)
+        if self._check_lock.locked():
+            await event.reply("[WAIT] Analysis already in progress, please wait...")
+            logger.info("[DRAFT BOT] [CHECK] Ignoring duplicate command - analysis already running")
+            return
 
-                if command_type == "report":
-                    # Execute Excel report command
-                    print(f"[VOICE] Executing REPORT command...")
-                    await voice_processor.execute_report_command(event, self)
+        async with self._check_lock:
+            await self._run_check(event)
 
-                elif command_type == "draft":
-                    # Execute draft generation command
-                    client_name = command_result["params"]["client_name"]
-                    print(f"[VOICE] Executing DRAFT command for '{client_name}'...")
-                    await voice_processor.execute_draft_command(event, self, client_name)
+    async def _run_check(self, event):
+        """Clear waiting states and re-run the core analysis"""
+        logger.info("[DRAFT BOT] Manual /check command received from owner")
+        logger.info("[DRAFT BOT] Clearing any waiting states before analysis...")
 
-                else:
-                    # Unknown command
-                    await event.reply(
-                        f"❓ [VOICE] Unknown command.\n\n"
-                        f"Supported commands:\n"
-                        f"• 'Звіт' or 'Експорт' - Generate Excel report\n"
-                        f"• 'Напиши [Ім'я]' - Generate draft for client"
+        # Clear all waiting states to unblock any pending operations
+        cleared = (self._awaiting_edit_chat is not None) + self.waiting_for_instructions
+        self._awaiting_edit_chat = None
+        self.waiting_for_instructions = False
+        logger.info("[DRAFT BOT] Waiting states cleared: %s items removed", cleared)
+
+        await event.reply(_CHECK_STARTED_REPLY)
+        run_core_logic = _from_main("run_core_logic")
+        try:
+            logger.info("[DRAFT BOT] [CHECK] Starting run_core_logic() to reanalyze recent messages...")
+            result = await asyncio.wait_for(
+                run_core_logic(draft_bot_param=self),  # Pass bot by reference
+                timeout=CHECK_TIMEOUT
+            )
+
+            success_msg = _CHECK_COMPLETE_TEMPLATE.format(result=result)
+            await event.reply(success_msg)
+            logger.info("[DRAFT BOT] [CHECK] Analysis complete - user notified")
+        except asyncio.TimeoutError:
+            # _check_lock is released by _cmd_check's async with
+            logger.error("[ERROR] /check analysis timed out after %ss", CHECK_TIMEOUT)
+            await event.reply(f"[ERROR] Analysis timed out after {int(CHECK_TIMEOUT)}s - please try /check again")
+        except Exception as e:
+            logger.exception("[ERROR] Analysis failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+
+    async def _cmd_export(self, event, message_text: str):
+        """/export - Finance export (Excel) for the last week"""
+        await event.reply("[PROCESSING] Generating finance export... Please wait.")
+        logger.info("[FINANCE EXPORT] Command received from owner")
+
+        # Generate finance report
+        try:
+            # Fetch recent chats
+            chats = await _from_main("fetch_chats_only")(limit=100, hours_ago=168)  # Last week
+
+            # Generate Excel report
+            # openpyxl serialization is blocking - run it in a worker thread.
+            # The exporter returns the saved path or raises - no extra stat() needed
+            excel_path = await asyncio.to_thread(finance_exporter.generate_excel_report, chats, [])
+
+            await self.client.send_file(
+                self.owner_id,
+                excel_path,
+                caption="[SUCCESS] Finance Export Report"
+            )
+            logger.info("[FINANCE EXPORT] [SUCCESS] Report sent: %s", excel_path)
+
+        except Exception as export_error:
+            await event.reply(f"[ERROR] Export failed: {export_error}")
+            logger.exception("[FINANCE EXPORT] [ERROR] %s", export_error)
+
+    async def _cmd_report(self, event, message_text: str):
+        """/report - Analytics report (scan reports/ folder)"""
+        logger.info("[DRAFT BOT] Analytics /report command received from owner")
+        await event.reply("[STATS] Scanning reports and generating analytics...")
+        try:
+            summary = await self.generate_analytics_report()
+            await event.reply(summary)
+        except Exception as e:
+            logger.exception("[ERROR] Report generation failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+
+    async def _cmd_generate_faq(self, event, message_text: str):
+        """/generate_faq - AI Self-Learning Knowledge Base Update"""
+        logger.info("[DRAFT BOT] /generate_faq command received from owner")
+        await event.reply("📚 [AI LEARNING] Generating FAQ from successful reply patterns...")
+        try:
+            kb_storage = get_knowledge_base()
+
+            # Get statistics
+            stats = kb_storage.get_statistics()
+            total_patterns = stats['total_patterns']
+
+            if total_patterns == 0:
+                await event.reply(_NO_PATTERNS_REPLY)
+                return
+
+            # Generate FAQ
+            result = kb_storage.generate_faq("dynamic_instructions.txt")
+
+            if result['success']:
+                success_msg = _FAQ_UPDATED_TEMPLATE.format(
+                    total_patterns=result['total_patterns'],
+                    topics_identified=result['topics_identified']
+                )
+                await event.reply(success_msg)
+                logger.info("[AI LEARNING] ✓ FAQ generated with %s patterns", result['total_patterns'])
+            else:
+                error_msg = f"❌ Failed to generate FAQ: {result.get('error', 'Unknown error')}"
+                await event.reply(error_msg)
+
+        except Exception as e:
+            logger.exception("[ERROR] FAQ generation failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+
+    async def _cmd_excel_report(self, event, message_text: str):
+        """Excel export for Звіт"""
+        logger.info("[DRAFT BOT] Report/Excel export command received from owner")
+        await event.reply("[STATS] Generating Excel report... This will take a moment...")
+        try:
+            await self.generate_excel_report(event)
+        except Exception as e:
+            logger.exception("[ERROR] Report generation failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+
+    async def _cmd_analytics(self, event, message_text: str):
+        """/analytics - Unified analytics (Format A + B reports)"""
+        logger.info("[DRAFT BOT] /analytics command received from owner")
+        await event.reply("[LOAD] Running unified analytics (Format A + B reports)...")
+
+        try:
+            # Run analytics
+            result = await run_unified_analytics(
+                reports_folder='reports',
+                output_file='unified_analytics.xlsx'
+            )
+
+            if result["success"]:
+                summary = result["summary"]
+
+                # Build formatted response - parts joined once instead of repeated +=
+                parts = [_ANALYTICS_TEMPLATE.format(**summary, **summary['format_breakdown'])]
+
+                # Add top FAQs
+                if summary['top_winning_faqs']:
+                    parts.extend(
+                        f"\n  {i}. {faq} ({count}x)"
+                        for i, (faq, count) in enumerate(summary['top_winning_faqs'][:5], 1)
                     )
+                else:
+                    parts.append("\n  [No FAQs found in winning deals]")
 
-            except Exception as e:
-                print(f"[VOICE] [ERROR] {type(e).__name__}: {e}")
-                import traceback
-                traceback.print_exc()
-                try:
-                    await event.reply(f"❌ [VOICE] Error: {e}")
-                except:
-                    pass
+                parts.append(f"\n\n[FILE]\n  Report: {result['file_path']}")
 
-    def _register_text_message_handler(self):
-        """Register text message handler for commands and edit replies"""
-        @self.client.on(events.NewMessage())
-        async def text_handler(event):
-            try:
-                # Only process messages from owner
-                if event.sender_id == self.owner_id:
-                    message = event.message
-                    message_text = message.text or ""
-                    message_text_lower = message_text.strip().lower()
+                await event.reply("".join(parts))
+                logger.info("[DRAFT BOT] [ANALYTICS] Complete - saved to %s", result['file_path'])
+            else:
+                error_msg = f"[ERROR] Analytics failed: {result['message']}"
+                logger.error("[DRAFT BOT] %s", error_msg)
+                await event.reply(error_msg)
 
-                    # ================================================================
-                    # COMMAND: /check - Manual analysis trigger
-                    # ================================================================
-                    if message_text_lower == "/check":
-                        print(f"[DRAFT BOT] Manual /check command received from owner")
-                        print(f"[DRAFT BOT] Clearing any waiting states before analysis...")
+        except Exception as e:
+            logger.exception("[DRAFT BOT] Command failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
 
-                        # Clear all waiting states to unblock any pending operations
-                        self.waiting_for_edit.clear()
-                        self.waiting_for_instructions = False
-                        print(f"[DRAFT BOT] Waiting states cleared: {len(self.waiting_for_edit)} items removed")
+    async def _cmd_view_instructions(self, event, message_text: str):
+        """/view_instructions - View current instructions"""
+        logger.info("[DRAFT BOT] /view_instructions command received from owner")
+        try:
+            manager = get_instructions_manager()
 
-                        await event.reply("[CHECK] Clearing states and triggering manual analysis of last 10 messages... This will take a moment...")
-                        from main import run_core_logic
-                        try:
-                            print(f"[DRAFT BOT] [CHECK] Starting run_core_logic() to reanalyze recent messages...")
-                            result = await run_core_logic(draft_bot_param=self)  # Pass bot by reference
+            # Two file reads plus a backup glob - one worker-thread hop instead of blocking the loop
+            current, dynamic, stats = await asyncio.to_thread(
+                lambda: (manager.get_current_instructions(), manager.get_dynamic_instructions(), manager.get_stats())
+            )
 
-                            success_msg = f"""[OK] ANALYSIS COMPLETE
+            # Build response
+            core_preview = current[:400] + "..." if len(current) > 400 else current
+            dynamic_preview = dynamic[:300] + "..." if len(dynamic) > 300 else dynamic
 
-[RESULT] {result}
+            response = _VIEW_INSTRUCTIONS_TEMPLATE.format(
+                core_preview=core_preview,
+                dynamic_preview=dynamic_preview,
+                **stats
+            )
+            await event.reply(response)
+        except Exception as e:
+            logger.exception("[ERROR] Command failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
 
-[NOTES]
-• All states cleared before analysis
-• Checked and processed recent messages
-• Drafts sent for any messages needing review
-• Check console for detailed debug output with [INPUT], [SMART_LOGIC], [ACTION] lines
-"""
-                            await event.reply(success_msg)
-                            print(f"[DRAFT BOT] [CHECK] Analysis complete - user notified")
-                        except Exception as e:
-                            error_msg = f"[ERROR] Analysis failed: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: /report - Analytics report (scan reports/ folder)
-                    # ================================================================
-                    elif message_text_lower == "/report":
-                        print(f"[DRAFT BOT] Analytics /report command received from owner")
-                        await event.reply("[STATS] Scanning reports and generating analytics...")
-                        try:
-                            summary = await self.generate_analytics_report()
-                            await event.reply(summary)
-                        except Exception as e:
-                            error_msg = f"[ERROR] Report generation failed: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: /generate_faq - AI Self-Learning Knowledge Base Update
-                    # ================================================================
-                    elif message_text_lower == "/generate_faq":
-                        print(f"[DRAFT BOT] /generate_faq command received from owner")
-                        await event.reply("📚 [AI LEARNING] Generating FAQ from successful reply patterns...")
-                        try:
-                            kb_storage = get_knowledge_base()
-
-                            # Get statistics
-                            stats = kb_storage.get_statistics()
-                            total_patterns = stats['total_patterns']
-
-                            if total_patterns == 0:
-                                await event.reply("⚠️ No successful patterns found yet!\n\nApprove some drafts first using the [Send] button, then try again.")
-                                return
-
-                            # Generate FAQ
-                            result = kb_storage.generate_faq("dynamic_instructions.txt")
-
-                            if result['success']:
-                                success_msg = f"""✅ **Knowledge Base Updated!**
+    async def _cmd_update_instructions(self, event, message_text: str):
+        """/update_instructions - Start instruction update flow"""
+        logger.info("[DRAFT BOT] /update_instructions command received from owner")
+        self.waiting_for_instructions = True
 
-📊 **Statistics:**
-• Total Successful Cases: {result['total_patterns']}
-• Topics Identified: {result['topics_identified']}
-• File: dynamic_instructions.txt
+        await event.reply(_UPDATE_INSTRUCTIONS_HELP)
 
-🎯 **Impact:**
-The AI will now use these {result['total_patterns']} successful patterns to:
-✓ Match your communication style
-✓ Provide consistent responses
-✓ Learn from approved replies
+    async def _cmd_list_backups(self, event, message_text: str):
+        """/list_backups - List available backups"""
+        logger.info("[DRAFT BOT] /list_backups command received from owner")
+        try:
+            manager = get_instructions_manager()
 
-📈 **Self-Learning Active:**
-Every time you click [Send], the AI learns and improves!
-"""
-                                await event.reply(success_msg)
-                                print(f"[AI LEARNING] ✓ FAQ generated with {result['total_patterns']} patterns")
-                            else:
-                                error_msg = f"❌ Failed to generate FAQ: {result.get('error', 'Unknown error')}"
-                                await event.reply(error_msg)
-
-                        except Exception as e:
-                            error_msg = f"[ERROR] FAQ generation failed: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: Excel export for Звіт
-                    # ================================================================
-                    elif "Звіт" in message_text:
-                        print(f"[DRAFT BOT] Report/Excel export command received from owner")
-                        await event.reply("[STATS] Generating Excel report... This will take a moment...")
-                        try:
-                            await self.generate_excel_report(event)
-                        except Exception as e:
-                            error_msg = f"[ERROR] Report generation failed: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: /analytics - Unified analytics (Format A + B reports)
-                    # ================================================================
-                    elif message_text_lower == "/analytics":
-                        print(f"[DRAFT BOT] /analytics command received from owner")
-                        await event.reply("[LOAD] Running unified analytics (Format A + B reports)...")
-
-                        try:
-                            from features.analytics_engine import run_unified_analytics
-
-                            # Run analytics
-                            result = await run_unified_analytics(
-                                reports_folder='reports',
-                                output_file='unified_analytics.xlsx'
-                            )
-
-                            if result["success"]:
-                                summary = result["summary"]
-
-                                # Build formatted response
-                                response = f"""[OK] UNIFIED ANALYTICS COMPLETE
+            backups = await asyncio.to_thread(manager.list_backups, limit=10)
 
-[DEALS]
-  Total: {summary['total_deals']}
-  Wins: {summary['total_wins']} ({summary['win_rate']:.1f}%)
-  Losses: {summary['total_losses']}
-  Unknown: {summary['total_unknown']}
+            if not backups:
+                await event.reply("[ERROR] No backups available yet")
+                return
 
-[REVENUE]
-  Total: ${summary['total_revenue']:,.2f}
-  Avg/Win: ${summary['avg_win_revenue']:,.2f}
+            lines = [f"{i}. {backup}" for i, backup in enumerate(backups, 1)]
+            await event.reply(_BACKUPS_TEMPLATE.format(backups="\n".join(lines), usage=_ROLLBACK_USAGE))
+        except Exception as e:
+            logger.exception("[ERROR] Command failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+
+    async def _cmd_rollback_backup(self, event, message_text: str):
+        """/rollback_backup - Restore from specific backup"""
+        logger.info("[DRAFT BOT] /rollback_backup command received from owner")
+        try:
+            # Parse backup filename from command
+            parts = message_text.split(maxsplit=1)
+            if len(parts) < 2:
+                await event.reply(_ROLLBACK_USAGE)
+                return
 
-[CUSTOMERS]
-  Unique: {summary['customer_count']}
+            backup_filename = parts[1].strip()
+            manager = get_instructions_manager()
 
-[FORMAT BREAKDOWN]
-  Format A Wins: {summary['format_breakdown']['format_a_wins']}
-  Format A Losses: {summary['format_breakdown']['format_a_losses']}
-  Format B Wins: {summary['format_breakdown']['format_b_wins']}
-  Format B Losses: {summary['format_breakdown']['format_b_losses']}
+            async with self._instructions_lock:
+                result = await manager.rollback_to_backup(backup_filename)
+            await event.reply(
+                f"{'[OK]' if result['success'] else '[ERROR]'} {result['message']}"
+            )
+        except Exception as e:
+            logger.exception("[ERROR] Command failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
 
-[TOP WINNING FAQs]"""
+    async def _handle_instructions_update(self, event, message_text: str):
+        """Instructions update processing - serialized so two updates cannot interleave their backups"""
+        async with self._instructions_lock:
+            await self._apply_instructions_update(event, message_text)
 
-                                # Add top FAQs
-                                if summary['top_winning_faqs']:
-                                    for i, (faq, count) in enumerate(summary['top_winning_faqs'][:5], 1):
-                                        response += f"\n  {i}. {faq} ({count}x)"
-                                else:
-                                    response += "\n  [No FAQs found in winning deals]"
-
-                                response += f"\n\n[FILE]\n  Report: {result['file_path']}"
-
-                                await event.reply(response)
-                                print(f"[DRAFT BOT] [ANALYTICS] Complete - saved to {result['file_path']}")
-                            else:
-                                error_msg = f"[ERROR] Analytics failed: {result['message']}"
-                                print(f"[DRAFT BOT] {error_msg}")
-                                await event.reply(error_msg)
-
-                        except Exception as e:
-                            error_msg = f"[ERROR] {type(e).__name__}: {str(e)}"
-                            print(f"[DRAFT BOT] {error_msg}")
-                            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: /view_instructions - View current instructions
-                    # ================================================================
-                    elif message_text_lower == "/view_instructions":
-                        print(f"[DRAFT BOT] /view_instructions command received from owner")
-                        try:
-                            from features.dynamic_instructions import get_instructions_manager
-                            manager = get_instructions_manager()
-
-                            current = manager.get_current_instructions()
-                            dynamic = manager.get_dynamic_instructions()
-                            stats = manager.get_stats()
-
-                            # Build response
-                            core_preview = current[:400] + "..." if len(current) > 400 else current
-                            dynamic_preview = dynamic[:300] + "..." if len(dynamic) > 300 else dynamic
-
-                            response = f"""[INFO] **CURRENT INSTRUCTIONS**
-
-**Core Instructions** ({stats['instructions_size']} chars):
-{core_preview}
+    async def _apply_instructions_update(self, event, message_text: str):
+        """Parse REPLACE:/APPEND:/PREPEND:/DYNAMIC:/CANCEL and update instructions.txt"""
+        logger.info("[DRAFT BOT] Processing instruction update")
+        try:
+            manager = get_instructions_manager()
 
-**Dynamic Rules** ({stats['dynamic_size']} chars):
-{dynamic_preview}
+            text = message_text.strip()
 
-**Backups Available**: {stats['backup_count']}
+            # Check for cancel - length first, so a long instructions body is never upper-cased
+            if len(text) == 6 and text.upper() == "CANCEL":
+                self.waiting_for_instructions = False
+                await event.reply("[ERROR] Instruction update cancelled")
+                return
 
-Available Commands:
-  /update_instructions - Edit instructions
-  /list_backups - Show available backups
-  /rollback_backup - Restore from backup
-"""
-                            await event.reply(response)
-                        except Exception as e:
-                            error_msg = f"[ERROR] Error: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            await event.reply(error_msg)
+            # Process based on mode - prefix parsed once, then one dict lookup
+            head, colon, body = text.partition(":")
+            if not colon or head not in _INSTRUCTION_MODES:
+                await event.reply(_INSTRUCTION_FORMAT_ERROR)
+                return
 
-                    # ================================================================
-                    # COMMAND: /update_instructions - Start instruction update flow
-                    # ================================================================
-                    elif message_text_lower.startswith("/update_instructions"):
-                        print(f"[DRAFT BOT] /update_instructions command received from owner")
-                        self.waiting_for_instructions = True
+            new_content = body.strip()
+            if not new_content:
+                await event.reply(f"[ERROR] {head} mode requires content after the colon")
+                return
 
-                        help_text = """[EDIT] **INSTRUCTIONS UPDATE MODE**
+            mode = _INSTRUCTION_MODES[head]
+            if mode is None:
+                result = await manager.update_dynamic_instructions(new_content)
+            else:
+                result = await manager.update_instructions(new_content, mode=mode)
 
-Send your update in format:
-  REPLACE: [new instructions text]
-  APPEND: [text to add at end]
-  PREPEND: [text to add at beginning]
-  DYNAMIC: [new dynamic rule to add]
-  CANCEL: Cancel this operation
+            # Send result (+ backup info) as one ordered batch
+            if result:
+                texts = [f"{'[OK]' if result['success'] else '[ERROR]'} {result['message']}"]
+                if result.get('backup_path'):
+                    texts.append(f"📦 Backup created: {result['backup_path']}")
+                await self._send_ordered(event.chat_id, texts)
 
-Examples:
-  APPEND: Always mention 24/7 customer support availability
-  DYNAMIC: New rule: Check current system status before responding
-  REPLACE: [Full new instructions text here...]
+            self.waiting_for_instructions = False
 
-Note: Automatic backup will be created before changes.
-"""
-                        await event.reply(help_text)
-
-                    # ================================================================
-                    # COMMAND: /list_backups - List available backups
-                    # ================================================================
-                    elif message_text_lower == "/list_backups":
-                        print(f"[DRAFT BOT] /list_backups command received from owner")
-                        try:
-                            from features.dynamic_instructions import get_instructions_manager
-                            manager = get_instructions_manager()
-
-                            backups = manager.list_backups(limit=10)
-
-                            if not backups:
-                                await event.reply("[ERROR] No backups available yet")
-                                return
-
-                            response = "[BACKUP] **AVAILABLE BACKUPS** (Most recent first)\n\n"
-                            for i, backup in enumerate(backups, 1):
-                                response += f"{i}. {backup}\n"
-
-                            response += "\nUse: /rollback_backup [filename]\nExample: /rollback_backup instructions_backup_20240215_120000.txt"
-                            await event.reply(response)
-                        except Exception as e:
-                            error_msg = f"[ERROR] Error: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # COMMAND: /rollback_backup - Restore from specific backup
-                    # ================================================================
-                    elif message_text_lower.startswith("/rollback_backup"):
-                        print(f"[DRAFT BOT] /rollback_backup command received from owner")
-                        try:
-                            from features.dynamic_instructions import get_instructions_manager
-
-                            # Parse backup filename from command
-                            parts = message_text.split(maxsplit=1)
-                            if len(parts) < 2:
-                                await event.reply("Usage: /rollback_backup [filename]\nExample: /rollback_backup instructions_backup_20240215_120000.txt")
-                                return
-
-                            backup_filename = parts[1].strip()
-                            manager = get_instructions_manager()
-
-                            result = await manager.rollback_to_backup(backup_filename)
-                            await event.reply(
-                                f"{'[OK]' if result['success'] else '[ERROR]'} {result['message']}"
-                            )
-                        except Exception as e:
-                            error_msg = f"[ERROR] Error: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            await event.reply(error_msg)
-
-                    # ================================================================
-                    # HANDLE: Instructions update processing
-                    # ================================================================
-                    elif self.waiting_for_instructions and message_text:
-                        print(f"[DRAFT BOT] Processing instruction update")
-                        try:
-                            from features.dynamic_instructions import get_instructions_manager
-                            manager = get_instructions_manager()
-
-                            text = message_text.strip()
-
-                            # Check for cancel
-                            if text.upper() == "CANCEL":
-                                self.waiting_for_instructions = False
-                                await event.reply("[ERROR] Instruction update cancelled")
-                                return
-
-                            # Process based on mode
-                            result = None
-
-                            if text.startswith("REPLACE:"):
-                                new_content = text[8:].strip()
-                                if not new_content:
-                                    await event.reply("[ERROR] REPLACE mode requires content after the colon")
-                                    return
-                                result = await manager.update_instructions(new_content, mode="replace")
-
-                            elif text.startswith("APPEND:"):
-                                new_content = text[7:].strip()
-                                if not new_content:
-                                    await event.reply("[ERROR] APPEND mode requires content after the colon")
-                                    return
-                                result = await manager.update_instructions(new_content, mode="append")
-
-                            elif text.startswith("PREPEND:"):
-                                new_content = text[8:].strip()
-                                if not new_content:
-                                    await event.reply("[ERROR] PREPEND mode requires content after the colon")
-                                    return
-                                result = await manager.update_instructions(new_content, mode="prepend")
-
-                            elif text.startswith("DYNAMIC:"):
-                                new_rule = text[8:].strip()
-                                if not new_rule:
-                                    await event.reply("[ERROR] DYNAMIC mode requires content after the colon")
-                                    return
-                                result = await manager.update_dynamic_instructions(new_rule)
-
-                            else:
-                                await event.reply("[ERROR] Invalid format. Use REPLACE:/APPEND:/PREPEND:/DYNAMIC:/CANCEL")
-                                return
-
-                            # Send result
-                            if result:
-                                await event.reply(
-                                    f"{'[OK]' if result['success'] else '[ERROR]'} {result['message']}"
-                                )
-
-                                if result.get('backup_path'):
-                                    await event.reply(f"📦 Backup created: {result['backup_path']}")
-
-                            self.waiting_for_instructions = False
-
-                        except Exception as e:
-                            error_msg = f"[ERROR] Error: {type(e).__name__}: {str(e)}"
-                            print(f"[ERROR] {error_msg}")
-                            await event.reply(error_msg)
-                            self.waiting_for_instructions = False
-
-                    # ================================================================
-                    # HANDLE: Edit text replies
-                    # ================================================================
-                    elif any(self.waiting_for_edit.values()):
-                        await self._safe_execute(
-                            self.handle_edit_text(event),
-                            "edit text"
-                        )
-            except Exception as e:
-                print(f"[ERROR] Text handler error: {type(e).__name__}: {e}")
-                print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
+        except Exception:
+            logger.exception("[ERROR] Command failed")
+            await event.reply(_GENERIC_ERROR_REPLY)
+            self.waiting_for_instructions = False
 
     # ========================================================================
     # BUTTON HANDLING
@@ -813,83 +1150,338 @@ Note: Automatic backup will be created before changes.
 
     async def handle_button_callback(self, event):
         """Handle inline button callbacks with proper feedback"""
-        # Filter: only process if from owner
-        if event.sender_id != self.owner_id:
-            await event.answer("Unauthorized")
+        # Owner only: registered with CallbackQuery(chats=owner_id) - other clicks never get here
+        try:
+            # Parse button data (Telethon delivers bytes): b"send_12345", b"edit_12345", b"skip_12345"
+            # fullmatch validates the shape, so int() below can't fail (and " 12" / "1_000" are rejected)
+            match = _CALLBACK_RE.fullmatch(event.data)
+            if match is None:
+                logger.warning("[ERROR] Button data parse error: %r", event.data)
+                await event.answer("Invalid button data", alert=True)
+                return
+            action, chat_id_bytes = match.groups()
+            handler = self._callbacks.get(action)
+            if handler is None:
+                await event.answer("Unknown action", alert=True)
+                return
+            chat_id = int(chat_id_bytes)
+
+            logger.debug("[DRAFT BOT] Button clicked: %r for chat %s", action, chat_id)
+            await handler(chat_id, event)
+
+        except Exception as e:
+            logger.exception("[ERROR] Button callback error")
+            await event.answer(f"Error: {type(e).__name__}", alert=True)
+
+    async def _on_send(self, chat_id: int, event):
+        """[OK] Send - deliver the stored draft (the "Sending..." answer goes out with the send)"""
+        await self._send_once(chat_id, event, self.approve_and_send)
+
+    async def _on_confirm(self, chat_id: int, event):
+        """[SEND] Confirm & Send - deliver the edited draft (the answer goes out with the send)"""
+        await self._send_once(chat_id, event, self.send_confirmed_edit)
+
+    async def _send_once(self, chat_id: int, event, send):
+        """Run send(chat_id, event) unless a send to this chat is already in flight (double-tap)"""
+        if chat_id in self._inflight_sends:
+            await event.answer("Already sending...", alert=False)
             return
+        self._inflight_sends.add(chat_id)
+        try:
+            await send(chat_id, event)
+        finally:
+            self._inflight_sends.discard(chat_id)
+
+    async def _on_edit(self, chat_id: int, event):
+        """[EDIT] - wait for the owner's edited text"""
+        # Mark waiting first - the owner may start typing as soon as the toast appears
+        self._awaiting_edit_chat = chat_id
+        # Confirm & Send closes this card (see send_confirmed_edit) - its Send must not deliver the old draft
+        self._edit_cards[chat_id] = event.message_id
+        # The toast and the prompt say we're waiting - the draft message itself is left as is
+        # (its buttons stay usable: the owner can still Send or Ignore the original draft)
+        await event.answer("Reply with the edited message", alert=False)
+        try:
+            # Send clear confirmation message
+            await self._bounded_send(
+                recipient_id=self.owner_id,
+                text=_EDIT_PROMPT
+            )
+            logger.debug("[DRAFT BOT] Edit confirmation message sent to owner")
+        except Exception:
+            logger.exception("[ERROR] Failed to send edit prompt")
+
+    async def _on_skip(self, chat_id: int, event):
+        """[X] Ignore - drop the draft"""
+        message_task = self._prefetch_message(event)
+        # Remove the draft this card shows (and any edit state for the chat) and confirm;
+        # a newer stored draft for the same chat belongs to another card and stays
+        shown = await self._claim_card_draft(event, chat_id, message_task)
+        if shown is not None:
+            draft_system.pop_draft(chat_id, shown[2])
+        self.pending_edits.pop(chat_id, None)
+        self._edit_cards.pop(chat_id, None)
+        if self._awaiting_edit_chat == chat_id:
+            self._awaiting_edit_chat = None
+        await event.answer("Draft deleted", alert=False)
+        # Update message to show skipped
+        try:
+            message = await message_task
+            message_text = message.text or ""
+            self._remember_button_message(await event.edit(
+                message_text + "\n\n[SKIPPED BY USER]",
+                buttons=self._strip_chat_buttons(message, chat_id)
+            ))
+        except Exception as e:
+            logger.exception("[ERROR] Failed to edit message")
+        logger.info("[DRAFT BOT] Draft skipped for chat %s", chat_id)
 
-        data = event.data.decode() if isinstance(event.data, bytes) else event.data
+    def _prefetch_message(self, event) -> asyncio.Future:
+        """
+        Start fetching the message the button is attached to.
 
+        CallbackQuery carries no event.message. Messages the bot sent or edited itself
+        are kept in _button_messages and returned without a request; otherwise
+        get_message() (an RPC) runs as a task and overlaps with event.answer().
+        """
+        cached = self._button_messages.get(event.message_id)
+        if cached is None:
+            return asyncio.ensure_future(event.get_message())
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(cached)
+        return future
+
+    def _remember_button_message(self, message):
+        """Cache a sent/edited message with inline buttons for _prefetch_message (non-Messages are ignored)"""
+        if not isinstance(message, Message):
+            return
+        self._button_messages[message.id] = message
+        self._button_messages.move_to_end(message.id)
+        if len(self._button_messages) > BUTTON_MESSAGE_CACHE_SIZE:
+            self._button_messages.popitem(last=False)
+
+    def _remember_card(self, message, drafts):
+        """Remember a sent notification and the (chat_id, (chat_title, original_message, draft_text)) it shows"""
+        if not isinstance(message, Message):
+            return
+        self._remember_button_message(message)
+        for chat_id, shown in drafts:
+            self._card_drafts[(message.id, chat_id)] = shown
+        while len(self._card_drafts) > CARD_DRAFT_CACHE_SIZE:
+            self._card_drafts.popitem(last=False)
+
+    def _drop_chat_cards(self, chat_id: int):
+        """Forget the drafts every card shows for chat_id - Send on them then finds no draft"""
+        for key in [key for key in self._card_drafts if key[1] == chat_id]:
+            del self._card_drafts[key]
+
+    async def _close_card(self, message_id: int, chat_id: int, note: str):
+        """Mark a card (not the clicked one) with note and remove chat_id's buttons from it"""
         try:
-            # Parse button data: "send_12345", "edit_12345", "skip_12345"
-            action, chat_id_str = data.split("_", 1)  # Split on first underscore only
-            chat_id = int(chat_id_str)
-
-            print(f"[DRAFT BOT] Button clicked: {action} for chat {chat_id} by owner {event.sender_id}")
-
-            if action == "send":
-                # Show "thinking" notification
-                await event.answer("Sending message...", alert=False)
-                await self.approve_and_send(chat_id, event)
-
-            elif action == "confirm":
-                # Handle confirmation of edited draft
-                await event.answer("Sending edited message...", alert=False)
-                await self.send_confirmed_edit(chat_id, event)
-
-            elif action == "edit":
-                # Show feedback and mark waiting
-                await event.answer("Reply with the edited message", alert=False)
-                self.waiting_for_edit[chat_id] = True
-                # Update button message to show we're waiting
-                try:
-                    # For CallbackQuery, fetch message asynchronously
-                    message = await event.get_message()
-                    message_text = message.text or ""
-                    await event.edit(
-                        message_text + "\n\n[WAITING FOR YOUR EDIT...]",
-                        buttons=None
-                    )
+            message = self._button_messages.get(message_id)
+            if message is None:
+                message = await self.client.get_messages(self.owner_id, ids=message_id)
+            if message is None:
+                return
+            self._remember_button_message(await self.client.edit_message(
+                self.owner_id, message_id, f"{message.text or ''}\n\n{note}",
+                buttons=self._strip_chat_buttons(message, chat_id)
+            ))
+        except Exception as e:
+            logger.warning("[ERROR] Failed to update card %s: %s", message_id, e)
 
-                    # Send clear confirmation message
-                    await self.tg_service.send_message(
-                        self.owner_id,
-                        "✍️ **I am listening. Please type the new response below:**\n\nSend your edited message and I'll forward it to the client.",
-                        buttons=None
-                    )
-                    print(f"[DRAFT BOT] Edit confirmation message sent to owner")
-                except Exception as e:
-                    print(f"[ERROR] Failed to edit message: {type(e).__name__}: {e}")
-                    print(f"[ERROR] Traceback: {traceback.format_exc()}")
-
-            elif action == "skip":
-                # Remove draft and confirm
-                draft_system.remove_draft(chat_id)
-                await event.answer("Draft deleted", alert=False)
-                # Update message to show skipped
+    async def _claim_card_draft(self, event, chat_id: int, message_task) -> tuple | None:
+        """
+        (chat_title, original_message, draft_text) shown on the clicked card for chat_id, removed from _card_drafts.
+
+        Cards sent before a restart are parsed from the message text (single notifications only).
+        None if the card doesn't show a draft for this chat.
+        """
+        shown = self._card_drafts.pop((event.message_id, chat_id), None)
+        if shown is not None:
+            return shown
+        message = await message_task
+        m = _NOTIFICATION_RE.search(message.text or "")
+        if m and int(m.group(2)) == chat_id:
+            chat_title, _, original_message, draft_text = (g.strip() for g in m.groups())
+            if draft_text != _NO_DRAFT_TEXT:
+                return chat_title, original_message, draft_text
+        return None
+
+    # ========================================================================
+    # SENDERS
+    # ========================================================================
+
+    async def _get_sender_name(self, event) -> str:
+        """Display name of the message sender (cached per sender_id)"""
+        name = self._sender_name_cache.get(event.sender_id)
+        if name is not None:
+            self._sender_name_cache.move_to_end(event.sender_id)
+            return name
+
+        # event.sender is usually filled from the update itself - RPC only as a fallback
+        sender = event.sender or await event.get_sender()
+        name = sender.first_name if hasattr(sender, 'first_name') else str(sender.id)
+
+        self._sender_name_cache[event.sender_id] = name
+        if len(self._sender_name_cache) > SENDER_NAME_CACHE_SIZE:
+            self._sender_name_cache.popitem(last=False)
+        return name
+
+    # ========================================================================
+    # AI DRAFTS
+    # ========================================================================
+
+    async def _generate_draft(self, message_text: str, sender_name: str, instructions: str,
+                              business_data: str = "") -> str:
+        """
+        Generate an AI draft for an incoming message.
+
+        Identical messages (after strip/lower) from the same sender with unchanged
+        business data and instructions reuse the cached draft instead of another
+        LLM call. The sender is part of the key: its name goes into the prompt.
+        """
+        key = ":".join((
+            hashlib.blake2b(f"{sender_name}\0{message_text.strip().lower()}".encode('utf-8'),
+                            digest_size=16).hexdigest(),
+            _file_digest(Path("business_data.txt")),
+            _file_digest(Path("instructions.txt")),
+        ))
+
+        cached = self._draft_cache.get(key)
+        if cached and time.monotonic() - cached[0] <= DRAFT_CACHE_TTL:
+            self._draft_cache.move_to_end(key)
+            logger.debug("[DRAFT BOT] [AI DRAFT] Cache hit for message from %s", sender_name)
+            return cached[1]
+
+        # business_data.txt was already read (off the loop) by the caller - "" falls back to the default
+        generator = AutoReplyGenerator(self._ai_api_key, business_data=business_data or None)
+        draft_text, _confidence = await generator.generate_reply(
+            chat_title=sender_name,
+            message_history=message_text,
+            analysis_report=instructions
+        )
+        if not draft_text:
+            raise ValueError("empty AI draft")
+
+        self._draft_cache[key] = (time.monotonic(), draft_text)
+        self._draft_cache.move_to_end(key)
+        while len(self._draft_cache) > DRAFT_CACHE_MAX_SIZE:
+            self._draft_cache.popitem(last=False)
+        return draft_text
+
+    # ========================================================================
+    # OWNER NOTIFICATIONS
+    # ========================================================================
+
+    async def _batch_worker(self, queue: asyncio.Queue, send_batch):
+        """Collect queued owner notifications for a short window and send them as one message"""
+        while True:
+            batch = [await queue.get()]
+            # Give a burst a moment to arrive, then drain whatever is queued
+            await asyncio.sleep(NOTIFY_BATCH_WINDOW)
+            while len(batch) < NOTIFY_BATCH_MAX:
                 try:
-                    # For CallbackQuery, fetch message asynchronously
-                    message = await event.get_message()
-                    message_text = message.text or ""
-                    await event.edit(
-                        message_text + "\n\n[SKIPPED BY USER]",
-                        buttons=None
-                    )
-                except Exception as e:
-                    print(f"[ERROR] Failed to edit message: {type(e).__name__}: {e}")
-                    print(f"[ERROR] Traceback: {traceback.format_exc()}")
-                print(f"[DRAFT BOT] Draft skipped for chat {chat_id}")
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
 
-            else:
-                await event.answer("Unknown action", alert=True)
+            try:
+                await send_batch(batch)
+            except Exception as e:
+                logger.warning("[WARNING] Failed to send interactive notification: %s: %s", type(e).__name__, e)
+
+    async def _send_notification_batch(self, batch: list):
+        """Send queued notifications: single format for one sender, compound message for several"""
+        # Callback data is per sender, so one sender = one row: its messages together, its newest draft
+        # (draft_text None - rate-limited message without a draft; an earlier draft of the sender is kept)
+        merged = {}
+        for sender_id, sender_name, message_text, draft_text in batch:
+            if sender_id in merged:
+                _, earlier_text, earlier_draft = merged[sender_id]
+                message_text = earlier_text + "\n" + message_text
+                if draft_text is None:
+                    draft_text = earlier_draft
+            merged[sender_id] = (sender_name, message_text, draft_text)
+
+        if len(merged) == 1:
+            (sender_id, (sender_name, message_text, draft_text)), = merged.items()
+            notification = _NOTIFICATION_TEMPLATE.format(
+                name=sender_name, sid=sender_id, text=message_text, draft=draft_text or _NO_DRAFT_TEXT
+            )
+            buttons = _make_action_buttons(sender_id)
+            sent = await self._bounded_send(
+                recipient_id=self.owner_id,
+                text=notification,
+                buttons=buttons
+            )
+            self._remember_card(sent, [(sender_id, merged[sender_id])] if draft_text else [])
+        else:
+            await self._send_compound("NEW MESSAGES ({count})", "\n\nChoose action:", [
+                (_BATCH_ITEM_TEMPLATE.format(n=n, name=sender_name, sid=sender_id, text=message_text,
+                                             draft=draft_text or _NO_DRAFT_TEXT),
+                 _make_batch_row(n, sender_id), sender_id,
+                 (sender_name, message_text, draft_text) if draft_text else None)
+                for n, (sender_id, (sender_name, message_text, draft_text)) in enumerate(merged.items(), 1)
+            ])
+        logger.debug("[DRAFT BOT] [INTERACTIVE] Sent %s notification(s) to owner", len(batch))
+
+    async def _send_compound(self, header: str, footer: str, items: list) -> bool:
+        """
+        Send numbered items to the owner in as few messages as fit TELEGRAM_TEXT_LIMIT.
 
-        except ValueError as e:
-            print(f"[ERROR] Button data parse error: {e}")
-            await event.answer("Invalid button data", alert=True)
-        except Exception as e:
-            print(f"[ERROR] Button callback error: {type(e).__name__}: {e}")
-            print(f"[ERROR] Full traceback:\n{traceback.format_exc()}")
-            await event.answer(f"Error: {type(e).__name__}", alert=True)
+        items are (text, button row, chat_id, (chat_title, original_message, draft_text) or None);
+        the last two are remembered per sent message (see _remember_card), None - no draft to send. header is formatted with
+        count= for each message. Returns True if every message was delivered.
+        """
+        budget = TELEGRAM_TEXT_LIMIT - len(header) - len(footer) - 8  # запас на {count} і роздільники
+        groups, group, size = [], [], 0
+        for item in items:
+            text = item[0]
+            if group and size + len(text) + 2 > budget:
+                groups.append(group)
+                group, size = [], 0
+            group.append(item)
+            size += len(text) + 2
+        groups.append(group)
+
+        # Parts are independent messages (own numbering and buttons) - send them concurrently
+        sent_messages = await asyncio.gather(*(
+            self._bounded_send(
+                recipient_id=self.owner_id,
+                text="\n\n".join([header.format(count=len(group)), *(item[0] for item in group)]) + footer,
+                buttons=[row for _, row, _, _ in group]
+            )
+            for group in groups
+        ))
+        for sent, group in zip(sent_messages, groups):
+            self._remember_card(sent, [(chat_id, shown) for _, _, chat_id, shown in group if shown])
+        return all(sent_messages)
+
+    async def _bounded_send(self, **kwargs):
+        """tg_service.send_message with at most OWNER_SEND_CONCURRENCY sends in flight"""
+        async with self._send_sem:
+            return await self.tg_service.send_message(**kwargs)
+
+    @staticmethod
+    def _strip_chat_buttons(message, chat_id: int):
+        """
+        Inline keyboard of the message without the buttons for chat_id.
+
+        Batched notifications carry buttons for several chats; acting on one
+        chat must keep the others. Returns None when nothing is left.
+        """
+        markup = getattr(message, "reply_markup", None)
+        if not isinstance(markup, ReplyInlineMarkup):
+            return None
+
+        suffix = f"_{chat_id}".encode()
+        rows = []
+        for row in markup.rows:
+            kept = [b for b in row.buttons if not getattr(b, "data", b"").endswith(suffix)]
+            if kept:
+                rows.append(KeyboardButtonRow(buttons=kept))
+        return ReplyInlineMarkup(rows=rows) if rows else None
 
     # ========================================================================
     # DRAFT MANAGEMENT
@@ -901,270 +1493,258 @@ Note: Automatic backup will be created before changes.
         chat_title: str,
         draft_text: str,
         confidence: int
-    ):
-        """Send draft to owner for review with inline keyboard buttons"""
-        print(f"\n[DRAFT SEND START] Attempting to send draft for review...")
-        print(f"[DRAFT SEND] Owner ID: {self.owner_id} (type: {type(self.owner_id).__name__})")
-        print(f"[DRAFT SEND] Chat ID: {chat_id} (title: {chat_title})")
-        print(f"[DRAFT SEND] Draft text length: {len(draft_text)} chars")
-        print(f"[DRAFT SEND] Confidence: {confidence}%")
-
-        if self.owner_id == 0 or self.owner_id is None:
-            print(f"[ERROR] OWNER_TELEGRAM_ID not configured! owner_id={self.owner_id}")
-            print(f"[ERROR] Set OWNER_TELEGRAM_ID in .env and restart the server")
-            return
-
-        print(f"[DRAFT SEND] Owner ID is valid: {self.owner_id}")
-        print(f"[DRAFT SEND] TelegramService available: {self.tg_service is not None}")
-        print(f"[DRAFT SEND] TelegramService client connected: {self.tg_service.client is not None if self.tg_service else False}")
-
-        # Format the draft message
-        message = f"""[BOT] **NEW DRAFT FOR REVIEW**
+    ) -> bool:
+        """
+        Queue a draft for owner review with inline keyboard buttons.
 
-**Chat**: {chat_title}
-**AI Confidence**: {confidence}%
-**Chat ID**: {chat_id}
+        Drafts arriving within NOTIFY_BATCH_WINDOW are sent as one message
+        (see _send_review_batch). Safe to call from the scheduler thread's loop:
+        the draft is handed over to the bot's loop.
 
-**PROPOSED RESPONSE:**
-{draft_text}
+        Returns True if the draft was queued (or, before start(), sent); False if
+        it could not be handed over - owner not configured, bot loop stopped or closed.
+        """
+        logger.debug(
+            "[DRAFT SEND] owner=%s chat=%s title=%s len=%d conf=%s%% connected=%s",
+            self.owner_id, chat_id, chat_title, len(draft_text), confidence,
+            self.tg_service.client is not None
+        )
 
---------------------
-**Choose action:**
-"""
+        if self.owner_id == 0 or self.owner_id is None:
+            logger.error("[ERROR] OWNER_TELEGRAM_ID not configured (owner_id=%s) - set it in .env and restart the server",
+                         self.owner_id)
+            return False
 
-        # Create inline keyboard buttons with Ukrainian text
-        buttons = [
-            [
-                Button.inline("[OK] SEND NOW", data=f"send_{chat_id}"),
-                Button.inline("📝 EDIT", data=f"edit_{chat_id}"),
-                Button.inline("[ERROR] SKIP", data=f"skip_{chat_id}")
-            ]
-        ]
+        item = (chat_id, chat_title, draft_text, confidence)
+        if self._review_queue is None:
+            # Bot not started (test scripts) - no worker to batch, send right away
+            return await self._send_review_batch([item])
+        if asyncio.get_running_loop() is self._loop:
+            self._review_queue.put_nowait(item)
+            return True
+        # A stopped loop would keep the callback forever, a closed one raises - report either as a failure
+        if self._loop.is_closed() or not self._loop.is_running():
+            logger.error("[DRAFT FAILED] [ERROR] Draft bot loop is not running - draft for chat %s not queued", chat_id)
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._review_queue.put_nowait, item)
+        except RuntimeError:  # closed between the check and the call
+            logger.error("[DRAFT FAILED] [ERROR] Draft bot loop closed - draft for chat %s not queued", chat_id)
+            return False
+        return True
 
+    async def _send_review_batch(self, batch: list) -> bool:
+        """Send queued drafts: the review format for one draft, a compound message for several (True if delivered)"""
         # Use TelegramService to send message (includes retry logic)
-        print(f"[DRAFT SEND] Calling tg_service.send_message()...")
+        # One row per chat (callback data is per chat) - a newer draft for the same chat replaces the older one
+        batch = list({item[0]: item for item in batch}.values())
         try:
-            success = await self.tg_service.send_message(
-                recipient_id=self.owner_id,
-                text=message,
-                buttons=buttons
-            )
+            if len(batch) == 1:
+                chat_id, chat_title, draft_text, confidence = batch[0]
+                # Format the draft message - static header/separator come from the template
+                message = _DRAFT_REVIEW_TEMPLATE.format(
+                    chat_title=chat_title,
+                    confidence=confidence,
+                    chat_id=chat_id,
+                    draft_text=draft_text
+                )
+                # Inline keyboard buttons (memoized per chat)
+                success = await self._bounded_send(
+                    recipient_id=self.owner_id,
+                    text=message,
+                    buttons=_review_buttons(chat_id)
+                )
+                self._remember_card(success, [(chat_id, (chat_title, "", draft_text))])
+            else:
+                success = await self._send_compound("[BOT] **NEW DRAFTS FOR REVIEW ({count})**", "\n\n**Choose action:**", [
+                    (_REVIEW_ITEM_TEMPLATE.format(n=n, chat_title=chat_title, chat_id=chat_id,
+                                                  confidence=confidence, draft_text=draft_text),
+                     _make_batch_row(n, chat_id), chat_id, (chat_title, "", draft_text))
+                    for n, (chat_id, chat_title, draft_text, confidence) in enumerate(batch, 1)
+                ])
 
             if success:
-                print(f"[DRAFT SUCCESS] [OK] Draft message delivered to owner ({self.owner_id})")
-                print(f"[DRAFT SUCCESS] Chat: {chat_title}")
+                logger.info("[DRAFT SUCCESS] [OK] %d draft(s) delivered to owner (%s)", len(batch), self.owner_id)
             else:
-                print(f"[DRAFT FAILED] [ERROR] Draft message FAILED after retries")
-                print(f"[DRAFT FAILED] TelegramService returned False")
-                print(f"[DRAFT FAILED] Check OWNER_TELEGRAM_ID or Telegram connection")
+                logger.error("[DRAFT FAILED] [ERROR] Draft message failed after retries - "
+                             "check OWNER_TELEGRAM_ID or Telegram connection")
+            return bool(success)
 
-        except Exception as e:
-            print(f"[DRAFT ERROR] [ERROR] Exception while sending draft: {type(e).__name__}: {e}")
-            print(f"[DRAFT ERROR] Traceback:\n{traceback.format_exc()}")
+        except Exception:
+            logger.exception("[DRAFT ERROR] [ERROR] Exception while sending draft")
+            return False
 
     async def approve_and_send(self, chat_id: int, event):
         """
         Approve and send the draft using DIRECT method (same as Quick_test.py)
 
-        This uses the exact working TelegramClient method proven in Quick_test.py:
-        - Create TelegramClient('aibi_session')
-        - Connect
-        - Send message
-        - Disconnect
+        Sends through the user session (aibi_session) - the same method proven in
+        Quick_test.py, but the client is connected once and reused (_get_send_client).
 
         ENHANCEMENTS:
         - Logs approved replies for Knowledge Base analysis
         - Detects meeting requests and auto-creates Google Calendar events
         """
-        # Get draft from AI message (extract from button callback message)
         try:
-            # For CallbackQuery, fetch message asynchronously
-            message = await event.get_message()
-            message_text = message.text or ""
-
-            # Extract chat title and original message for logging
-            chat_title = "Unknown"
-            original_message = ""
-            if "NEW MESSAGE from" in message_text:
-                try:
-                    chat_title = message_text.split("NEW MESSAGE from ")[1].split(" (")[0].strip()
-                    original_message = message_text.split("MESSAGE:\n")[1].split("\n\nAI DRAFT:")[0].strip()
-                except:
-                    pass
-
-            # Extract AI draft from notification message
-            # Format: "NEW MESSAGE from...\n\nMESSAGE:\n...\n\nAI DRAFT:\n{draft}\n\nChoose action:"
-            if "AI DRAFT:" in message_text:
-                draft_text = message_text.split("AI DRAFT:")[1].split("\n\nChoose action:")[0].strip()
-            else:
-                # Fallback: try to get from draft_system
-                draft = draft_system.get_draft(chat_id)
-                if draft:
-                    draft_text = draft["draft"]
-                    chat_title = draft.get("chat_title", "Unknown")
-                    original_message = draft.get("original_message", "")
-                else:
-                    await event.answer("Draft not found", alert=True)
-                    await event.edit("Draft not found - already deleted?")
-                    return
-
-            print(f"[DRAFT BOT] [DIRECT SEND] Sending to chat {chat_id}")
-            print(f"[DRAFT BOT] [DIRECT SEND] Message length: {len(draft_text)} chars")
-
-            # DIRECT METHOD - Same as Quick_test.py (proven to work)
-            from telethon import TelegramClient
-
-            api_id = int(os.getenv("TG_API_ID"))
-            api_hash = os.getenv("TG_API_HASH")
-
-            print(f"[DRAFT BOT] [DIRECT SEND] Creating TelegramClient with aibi_session")
-            client = TelegramClient('aibi_session', api_id, api_hash)
+            # The button message is only needed to update the UI - fetch it alongside the send
+            message_task = self._prefetch_message(event)
+
+            # Send exactly the draft shown on the clicked card - draft_system only keeps the
+            # newest draft per chat, which an older card (or another row of a batch) never showed.
+            # Claimed atomically: a second click can't send it again; put back if the send fails
+            shown = await self._claim_card_draft(event, chat_id, message_task)
+            if shown is None:
+                # Already sent/edited/skipped, or unknown card - the stored draft for the chat may
+                # belong to a newer card, so nothing is sent
+                await event.answer("Draft no longer available", alert=True)
+                return
+            chat_title, original_message, draft_text = shown
+            # The stored draft goes too, but only if it is this one - a newer draft waits for its own card
+            draft = draft_system.pop_draft(chat_id, draft_text)
 
+            # DIRECT METHOD - user session (aibi_session), connected once and reused
             try:
-                print(f"[DRAFT BOT] [DIRECT SEND] Connecting...")
-                await client.connect()
-
-                if not await client.is_user_authorized():
-                    raise Exception("Session not authorized")
-
-                print(f"[DRAFT BOT] [DIRECT SEND] Sending message to {chat_id}...")
-                # EXACT same call that worked in Quick_test.py
-                await client.send_message(chat_id, draft_text)
-
-                print(f"[DRAFT BOT] [DIRECT SEND] [SUCCESS] Message sent!")
+                logger.debug("[DRAFT BOT] [DIRECT SEND] Sending %d chars to chat %s", len(draft_text), chat_id)
+                await self._send_with_ack(event, "Sending message...", chat_id, draft_text)
 
-                # === ENHANCEMENT 1: Log approved reply for Knowledge Base ===
-                # === AI SELF-LEARNING: Capture Success Pattern ===
-                try:
-                    kb_storage = get_knowledge_base()
-                    confidence = 90  # Default confidence for manually approved replies
-
-                    # Save to successful_replies.json
-                    success = kb_storage.add_successful_reply(
-                        chat_id=chat_id,
-                        chat_title=chat_title,
-                        client_question=original_message,
-                        approved_response=draft_text,
-                        confidence=confidence
-                    )
-
-                    if success:
-                        print(f"[AI LEARNING] ✓ Success pattern captured from '{chat_title}'")
-                        print(f"[AI LEARNING] Total patterns: {len(kb_storage.data['replies'])}")
-                    else:
-                        print(f"[AI LEARNING] [WARN] Failed to save pattern")
-
-                except Exception as kb_error:
-                    print(f"[AI LEARNING] [ERROR] Failed to capture pattern: {kb_error}")
-                    import traceback
-                    traceback.print_exc()
-
-                # === ENHANCEMENT 2: Auto-Booking for meeting requests ===
-                try:
-                    from features.smart_enhancements import AutoBookingManager
-                    from calendar_client import GoogleCalendarClient
-
-                    calendar = GoogleCalendarClient()
-                    auto_booking = AutoBookingManager(calendar)
-
-                    meeting_info = await auto_booking.detect_meeting_request(original_message, draft_text)
-                    if meeting_info:
-                        print(f"[AUTO-BOOKING] Meeting detected! Creating calendar event...")
-                        await auto_booking.create_pending_meeting(
-                            chat_id=chat_id,
-                            chat_title=chat_title,
-                            message_text=original_message,
-                            meeting_info=meeting_info
-                        )
-                        print(f"[AUTO-BOOKING] [SUCCESS] Calendar event created for {chat_title}")
-                except Exception as booking_error:
-                    print(f"[AUTO-BOOKING] [ERROR] Failed to create event: {booking_error}")
+                logger.info("[DRAFT BOT] [DIRECT SEND] [SUCCESS] Message sent to chat %s", chat_id)
 
                 # Success! Update UI
                 await event.answer("Message delivered!", alert=False)
                 try:
-                    await event.edit(
+                    message = await message_task
+                    message_text = message.text or ""
+                    self._remember_button_message(await event.edit(
                         f"{message_text}\n\n[SUCCESS] Message sent to chat {chat_id}",
-                        buttons=None
-                    )
+                        buttons=self._strip_chat_buttons(message, chat_id)
+                    ))
                 except Exception as e:
-                    print(f"[ERROR] Failed to edit message: {e}")
+                    logger.warning("[ERROR] Failed to edit message: %s", e)
 
-                # Remove draft
-                draft_system.remove_draft(chat_id)
+                # Enhancements don't affect delivery - run them after the UI update, in the background
+                self._spawn_background(self._post_send_learn(chat_id, chat_title, original_message, draft_text))
+                if has_meeting_hint(original_message):
+                    self._spawn_background(self._post_send_booking(chat_id, chat_title, original_message, draft_text))
 
             except Exception as send_error:
-                print(f"[DRAFT BOT] [DIRECT SEND] [ERROR] {send_error}")
+                logger.error("[DRAFT BOT] [DIRECT SEND] [ERROR] %s", send_error)
+                self._card_drafts[(event.message_id, chat_id)] = shown
+                if draft:
+                    draft_system.restore_draft(chat_id, draft)
                 await event.answer("Failed to send message", alert=True)
                 try:
-                    await event.edit(
+                    message = await message_task
+                    message_text = message.text or ""
+                    # Keep the keyboard as is - Send for this chat is needed to retry, other rows stay usable
+                    self._remember_button_message(await event.edit(
                         f"{message_text}\n\n[ERROR] Failed to send - please retry",
-                        buttons=None
-                    )
+                        buttons=message.reply_markup
+                    ))
                 except:
                     pass
-            finally:
-                await client.disconnect()
-                print(f"[DRAFT BOT] [DIRECT SEND] Disconnected")
 
         except Exception as e:
-            print(f"[ERROR] Error in approve_and_send: {type(e).__name__}: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.exception("[ERROR] Error in approve_and_send")
             try:
                 await event.answer(f"Error: {e}", alert=True)
             except:
                 pass
 
-    async def handle_edit_text(self, event):
-        """Handle edited text when user sends new message after EDIT button"""
+    @functools.cached_property
+    def auto_booking(self) -> AutoBookingManager:
+        """
+        Auto-booking manager, built on first use and reused.
+
+        The calendar client authenticates (reads credentials.json, builds the
+        API service) on its first event - once per bot instead of per approval.
+        """
+        return AutoBookingManager(GoogleCalendarClient())
+
+    def _spawn_background(self, coro):
+        """Fire-and-forget task; the reference is kept until it finishes so it is not garbage-collected"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _post_send_learn(self, chat_id: int, chat_title: str, original_message: str, draft_text: str):
+        """ENHANCEMENT 1: Log approved reply for Knowledge Base (AI SELF-LEARNING: Capture Success Pattern)"""
         try:
-            # For NewMessage events, event.message is a direct property
-            message = event.message
-            new_text = message.text.strip() if message.text else ""
-            if not new_text:
-                return
+            kb_storage = get_knowledge_base()
+            confidence = 90  # Default confidence for manually approved replies
+
+            # Save to successful_replies.json
+            success = kb_storage.add_successful_reply(
+                chat_id=chat_id,
+                chat_title=chat_title,
+                client_question=original_message,
+                approved_response=draft_text,
+                confidence=confidence
+            )
 
-            # Find which chat_id is waiting for edit
-            chat_id = None
-            for cid, waiting in list(self.waiting_for_edit.items()):
-                if waiting:
-                    chat_id = cid
-                    break
+            if success:
+                logger.info("[AI LEARNING] ✓ Success pattern captured from '%s' (total patterns: %d)",
+                            chat_title, len(kb_storage.data['replies']))
+            else:
+                logger.warning("[AI LEARNING] [WARN] Failed to save pattern")
+
+        except Exception:
+            logger.exception("[AI LEARNING] [ERROR] Failed to capture pattern")
+
+    async def _post_send_booking(self, chat_id: int, chat_title: str, original_message: str, draft_text: str):
+        """ENHANCEMENT 2: Auto-Booking for meeting requests"""
+        try:
+            meeting_info = await self.auto_booking.detect_meeting_request(original_message, draft_text)
+            if meeting_info:
+                logger.info("[AUTO-BOOKING] Meeting detected! Creating calendar event...")
+                await self.auto_booking.create_pending_meeting(
+                    chat_id=chat_id,
+                    chat_title=chat_title,
+                    message_text=original_message,
+                    meeting_info=meeting_info
+                )
+                logger.info("[AUTO-BOOKING] [SUCCESS] Calendar event created for %s", chat_title)
+        except Exception as booking_error:
+            logger.exception("[AUTO-BOOKING] [ERROR] Failed to create event: %s", booking_error)
 
-            if not chat_id:
+    async def handle_edit_text(self, event):
+        """Handle edited text when user sends new message after EDIT button"""
+        try:
+            # Which chat is waiting for edit - checked first, before touching the message
+            chat_id = self._awaiting_edit_chat
+            if chat_id is None:
                 return
 
-            # Reset the waiting flag
-            self.waiting_for_edit[chat_id] = False
+            # For NewMessage events, event.message is a direct property
+            new_text = (event.message.text or "").strip()
+            if not new_text:
+                return  # sticker/media - keep waiting for the text
+            self._awaiting_edit_chat = None
 
-            # ENHANCED: Show confirmation button instead of sending immediately
+            # ENHANCED: Show confirmation button instead of sending immediately.
+            # Title from the edited card, the stored draft, or (rate-limited card without a draft) the sender cache
+            shown = self._card_drafts.get((self._edit_cards.get(chat_id), chat_id))
             draft = draft_system.get_draft(chat_id)
-            if not draft:
+            chat_title = shown[0] if shown else draft['chat_title'] if draft else self._sender_name_cache.get(chat_id)
+            if chat_title is None:
                 await event.reply("[ERROR] Draft not found - already sent?")
                 return
 
             # Show new draft with confirmation button
-            confirmation_message = (
-                f"[EDITED DRAFT] for {draft['chat_title']} (ID: {chat_id})\n\n"
-                f"NEW TEXT:\n{new_text}\n\n"
-                f"Confirm to send this edited version:"
+            confirmation_message = _EDITED_DRAFT_TEMPLATE.format(
+                chat_title=chat_title, chat_id=chat_id, new_text=new_text
             )
 
-            confirm_button = [
-                [Button.inline("[SEND] Confirm & Send", f"confirm_{chat_id}")]
-            ]
+            confirm_button = _confirm_buttons(chat_id)
 
             # Store the edited text temporarily
-            if not hasattr(self, 'pending_edits'):
-                self.pending_edits = {}
             self.pending_edits[chat_id] = new_text
 
-            await event.reply(confirmation_message, buttons=confirm_button)
-            print(f"[DRAFT BOT] Edited draft shown with confirmation button for chat {chat_id}")
+            self._remember_button_message(await event.reply(confirmation_message, buttons=confirm_button))
+            logger.debug("[DRAFT BOT] Edited draft shown with confirmation button for chat %s", chat_id)
 
         except Exception as e:
-            print(f"[ERROR] Error in handle_edit_text: {type(e).__name__}: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.exception("[ERROR] Error in handle_edit_text")
 
     async def send_confirmed_edit(self, chat_id: int, event):
         """
@@ -1173,134 +1753,68 @@ Note: Automatic backup will be created before changes.
         """
         try:
             # Get the pending edited text
-            if not hasattr(self, 'pending_edits') or chat_id not in self.pending_edits:
+            edited_text = self.pending_edits.get(chat_id)
+            if edited_text is None:
                 await event.answer("Edit text not found", alert=True)
                 await event.edit("[ERROR] Edit text was lost - please try again")
                 return
 
-            edited_text = self.pending_edits[chat_id]
-            # For CallbackQuery, fetch message asynchronously
-            message = await event.get_message()
-            message_text = message.text or ""
-
-            print(f"[DRAFT BOT] [DIRECT SEND] Sending edited message to chat {chat_id}")
-            print(f"[DRAFT BOT] [DIRECT SEND] Message length: {len(edited_text)} chars")
-
-            # DIRECT METHOD - Same as Quick_test.py (proven to work)
-            from telethon import TelegramClient
-
-            api_id = int(os.getenv("TG_API_ID"))
-            api_hash = os.getenv("TG_API_HASH")
-
-            print(f"[DRAFT BOT] [DIRECT SEND] Creating TelegramClient with aibi_session")
-            client = TelegramClient('aibi_session', api_id, api_hash)
+            # The button message is only needed to update the UI - fetch it alongside the send
+            message_task = self._prefetch_message(event)
 
+            # DIRECT METHOD - user session (aibi_session), connected once and reused
             try:
-                print(f"[DRAFT BOT] [DIRECT SEND] Connecting...")
-                await client.connect()
+                logger.debug("[DRAFT BOT] [DIRECT SEND] Sending edited message (%d chars) to chat %s",
+                             len(edited_text), chat_id)
+                await self._send_with_ack(event, "Sending edited message...", chat_id, edited_text)
 
-                if not await client.is_user_authorized():
-                    raise Exception("Session not authorized")
-
-                print(f"[DRAFT BOT] [DIRECT SEND] Sending edited message to {chat_id}...")
-                # EXACT same call that worked in Quick_test.py
-                await client.send_message(chat_id, edited_text)
-
-                print(f"[DRAFT BOT] [DIRECT SEND] [SUCCESS] Edited message sent!")
+                logger.info("[DRAFT BOT] [DIRECT SEND] [SUCCESS] Edited message sent to chat %s", chat_id)
 
                 # Success! Update UI
                 await event.answer("Edited message delivered!", alert=False)
                 try:
-                    await event.edit(
+                    message = await message_task
+                    message_text = message.text or ""
+                    self._remember_button_message(await event.edit(
                         f"{message_text}\n\n[SUCCESS] Edited message sent to chat {chat_id}",
-                        buttons=None
-                    )
+                        buttons=self._strip_chat_buttons(message, chat_id)
+                    ))
                 except Exception as e:
-                    print(f"[ERROR] Failed to edit message: {e}")
-
-                # Clean up
-                del self.pending_edits[chat_id]
-                draft_system.remove_draft(chat_id)
+                    logger.warning("[ERROR] Failed to edit message: %s", e)
+
+                # Clean up: the chat is answered - no card may send its original draft any more
+                self.pending_edits.pop(chat_id, None)
+                card_id = self._edit_cards.pop(chat_id, None)
+                # The stored draft goes only if it is the one the edited card showed -
+                # a newer draft for the chat belongs to another card
+                shown = self._card_drafts.get((card_id, chat_id))
+                if shown is not None:
+                    draft_system.pop_draft(chat_id, shown[2])
+                self._drop_chat_cards(chat_id)
+                if card_id is not None:
+                    await self._close_card(card_id, chat_id, "[EDITED VERSION SENT]")
 
             except Exception as send_error:
-                print(f"[DRAFT BOT] [DIRECT SEND] [ERROR] {send_error}")
+                logger.error("[DRAFT BOT] [DIRECT SEND] [ERROR] %s", send_error)
                 await event.answer("Failed to send edited message", alert=True)
                 try:
-                    await event.edit(
+                    message = await message_task
+                    message_text = message.text or ""
+                    # Keep Confirm & Send - it is how the owner retries
+                    self._remember_button_message(await event.edit(
                         f"{message_text}\n\n[ERROR] Failed to send - please retry",
-                        buttons=None
-                    )
+                        buttons=message.reply_markup
+                    ))
                 except:
                     pass
-            finally:
-                await client.disconnect()
-                print(f"[DRAFT BOT] [DIRECT SEND] Disconnected")
 
         except Exception as e:
-            print(f"[ERROR] Error in send_confirmed_edit: {type(e).__name__}: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+            logger.exception("[ERROR] Error in send_confirmed_edit")
             try:
                 await event.answer(f"Error: {e}", alert=True)
             except:
                 pass
 
-    async def send_edited_message(self, chat_id: int, new_text: str, event):
-        """DEPRECATED: Old method - now using send_confirmed_edit with Direct Send"""
-        draft = draft_system.get_draft(chat_id)
-
-        if not draft:
-            try:
-                await event.reply("Draft not found - already sent?")
-            except Exception as e:
-                print(f"[ERROR] Failed to reply: {e}")
-            return
-
-        try:
-            print(f"[DRAFT BOT] Sending edited message to chat {chat_id}...")
-
-            # CRITICAL FIX: Fetch the entity first before sending
-            try:
-                entity = await self.client.get_entity(chat_id)
-                print(f"[DRAFT BOT] Entity fetched for chat {chat_id}: {entity}")
-            except Exception as e:
-                print(f"[ERROR] Failed to get entity for {chat_id}: {e}")
-                await event.reply("Error: Cannot resolve recipient")
-                return
-
-            # Now send the message to the resolved entity
-            try:
-                await self.client.send_message(entity, new_text)
-                print(f"[DRAFT BOT] Edited message sent to entity successfully")
-
-                # Confirm to owner
-                try:
-                    await event.reply(
-                        f"[SUCCESS] Edited message sent to {draft['chat_title']}\n\n"
-                        f"Original draft was replaced with your edits."
-                    )
-                except Exception as e:
-                    print(f"[ERROR] Failed to send confirmation reply: {e}")
-
-                # Remove draft
-                draft_system.remove_draft(chat_id)
-                print(f"[DRAFT BOT] Edited message delivered to chat {chat_id}")
-
-            except Exception as send_error:
-                print(f"[ERROR] Failed to send edited message: {type(send_error).__name__}: {send_error}")
-                try:
-                    await event.reply("[ERROR] Failed to send edited message. Please try again.")
-                except Exception as e:
-                    print(f"[ERROR] Failed to send error reply: {e}")
-                print(f"[ERROR] Failed to send edited message to chat {chat_id}")
-
-        except Exception as e:
-            print(f"[ERROR] Error in send_edited_message: {type(e).__name__}: {e}")
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
-            try:
-                await event.reply(f"[ERROR] Failed to send edited message: {e}")
-            except:
-                pass
-
     # ========================================================================
     # REPORTING & ANALYTICS
     # ========================================================================
@@ -1310,45 +1824,18 @@ Note: Automatic backup will be created before changes.
         Scan reports/ folder and generate analytics summary.
         Returns a formatted summary string.
         """
-        print("[DRAFT BOT] [REPORT] Starting analytics scan...")
+        logger.info("[DRAFT BOT] [REPORT] Starting analytics scan...")
 
-        reports_dir = Path("reports")
-        if not reports_dir.exists():
+        # Listing and scanning both run in one worker thread - the event loop is not blocked by disk I/O
+        scan = await asyncio.to_thread(_scan_reports_dir, "reports")
+        if scan is None:
             return "[ERROR] Reports folder not found"
 
-        report_files = list(reports_dir.glob("*.txt"))
-        if not report_files:
+        total_chats, high_confidence_count, drafted_count = scan
+        if not total_chats:
             return "[ERROR] No reports found"
 
-        print(f"[DRAFT BOT] [REPORT] Found {len(report_files)} report files")
-
-        # Scan and summarize
-        total_chats = len(report_files)
-        high_confidence_count = 0
-        drafted_count = 0
-
-        for report_file in report_files:
-            try:
-                content = report_file.read_text(encoding="utf-8", errors="ignore")
-
-                # Count high confidence reports
-                if "ВПЕВНЕНІСТЬ ШІ:" in content:
-                    lines = content.split("\n")
-                    for line in lines:
-                        if "ВПЕВНЕНІСТЬ ШІ:" in line:
-                            try:
-                                confidence = int(line.split(":")[1].strip())
-                                if confidence >= 80:
-                                    high_confidence_count += 1
-                            except:
-                                pass
-
-                # Count drafts sent
-                if "DRAFT FOR REVIEW" in content or "AUTO-REPLY SENT" in content:
-                    drafted_count += 1
-
-            except Exception as e:
-                print(f"[ERROR] Error reading {report_file.name}: {e}")
+        logger.debug("[DRAFT BOT] [REPORT] Scanned %d report files", total_chats)
 
         # Format response
         summary = f"""
@@ -1359,9 +1846,9 @@ Note: Automatic backup will be created before changes.
 [DRAFT] Drafts/Replies: {drafted_count}
 
 --------------------
-Report generation completed at {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Report generation completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
-        print(f"[DRAFT BOT] [REPORT] Analytics complete")
+        logger.info("[DRAFT BOT] [REPORT] Analytics complete")
         return summary.strip()
 
     async def generate_excel_report(self, event):
@@ -1369,30 +1856,28 @@ Report generation completed at {__import__('datetime').datetime.now().strftime('
         Generate Excel report with comprehensive analytics data.
         Uses the excel_module for data collection and formatting.
         """
-        print("[DRAFT BOT] [EXCEL] Starting Excel report generation...")
+        logger.info("[DRAFT BOT] [EXCEL] Starting Excel report generation...")
 
         try:
-            from excel_module import get_excel_collector
-
             collector = get_excel_collector()
 
-            # Collect all data from reports
-            collector.collect_all_data()
+            # Collect all data from reports (file scanning - off the event loop)
+            await asyncio.to_thread(collector.collect_all_data)
             summary = collector.format_for_summary()
 
             # Send summary to user
             await event.reply(summary)
 
             # Prepare Excel sheets (ready for export)
-            sheets_data = collector.prepare_excel_sheets()
-            print(f"[DRAFT BOT] [EXCEL] Prepared {len(sheets_data)} sheets for export")
+            sheets_data = await asyncio.to_thread(collector.prepare_excel_sheets)
+            logger.debug("[DRAFT BOT] [EXCEL] Prepared %d sheets for export", len(sheets_data))
 
             # Try to export if openpyxl is available
-            excel_file_path = collector.export_to_excel("AIBI_Report.xlsx")
+            excel_file_path = await asyncio.to_thread(collector.export_to_excel, "AIBI_Report.xlsx")
 
             if excel_file_path:
                 await event.reply(f"[OK] Excel file ready: {excel_file_path}")
-                print(f"[DRAFT BOT] [EXCEL] File exported successfully")
+                logger.info("[DRAFT BOT] [EXCEL] File exported: %s", excel_file_path)
             else:
                 await event.reply(
                     "[WARN] Excel file export requires openpyxl.\n"
@@ -1400,27 +1885,122 @@ Report generation completed at {__import__('datetime').datetime.now().strftime('
                     "Data collection is ready, awaiting library."
                 )
 
-            print("[DRAFT BOT] [EXCEL] Report generation complete")
+            logger.info("[DRAFT BOT] [EXCEL] Report generation complete")
 
         except Exception as e:
             await event.reply(f"[ERROR] Error generating Excel: {e}")
-            print(f"[ERROR] Excel generation error: {e}")
+            logger.exception("[ERROR] Excel generation error")
 
     # ========================================================================
     # UTILITY METHODS
     # ========================================================================
 
+    async def _send_ordered(self, recipient_id: int, texts: list):
+        """
+        Send several messages to one chat in a single pipelined call.
+
+        Telethon chains the requests with invokeAfterMsg (ordered=True), so
+        Telegram delivers them in order without a round-trip per message.
+        """
+        if len(texts) == 1:
+            await self.client.send_message(recipient_id, texts[0])
+            return
+
+        peer = await self.client.get_input_entity(recipient_id)
+        requests = []
+        for text in texts:
+            message, entities = markdown.parse(text)
+            requests.append(functions.messages.SendMessageRequest(
+                peer=peer,
+                message=message,
+                entities=entities or None
+            ))
+        await self.client(requests, ordered=True)
+
     async def _safe_execute(self, coro, action_name: str):
         """Wrapper to safely execute operations and handle errors"""
         try:
             await coro
         except Exception as e:
-            print(f"[ERROR] Error during {action_name}: {type(e).__name__}: {e}")
+            logger.exception("[ERROR] Error during %s: %s: %s", action_name, type(e).__name__, e)
+
+    async def _get_send_client(self) -> TelegramClient:
+        """
+        User-session client for direct sends, connected on first use and kept open.
+
+        Reconnecting per button press cost a full MTProto handshake and session
+        load every time. The client keeps its own copy of aibi_session
+        (SEND_SESSION_NAME), so holding it open never locks the SQLite file that
+        fetch_chats_only and TelegramCollector use. Raises if the session is not authorized.
+        """
+        async with self._send_client_lock:
+            if self._send_client is None:
+                # Known-unauthorized session: fail with a stat instead of connect/authorize/disconnect
+                # on every incoming message (_warm_send_peer) until aibi_session is re-authorized
+                session_mtime = _user_session_mtime()
+                if session_mtime is not None and session_mtime == self._unauthorized_session_mtime:
+                    raise Exception("Session not authorized")
+                await asyncio.to_thread(_copy_user_session)
+                self._send_client = TelegramClient(SEND_SESSION_NAME, self.api_id, self.api_hash)
+                self._send_session_mtime = session_mtime
+            if not self._send_client.is_connected():
+                await self._send_client.connect()
+                if not await self._send_client.is_user_authorized():
+                    await self._send_client.disconnect()
+                    # Re-copied once aibi_session changes (e.g. gets authorized again)
+                    self._send_client = None
+                    self._unauthorized_session_mtime = self._send_session_mtime
+                    raise Exception("Session not authorized")
+            return self._send_client
+
+    async def _get_send_peer(self, client: TelegramClient, chat_id: int) -> TypeInputPeer:
+        """InputPeer for chat_id on the send client, cached after the first lookup"""
+        peer = self._peer_cache.get(chat_id)
+        if peer is not None:
+            self._peer_cache.move_to_end(chat_id)
+            return peer
+
+        peer = self._peer_cache[chat_id] = await client.get_input_entity(chat_id)
+        if len(self._peer_cache) > SEND_PEER_CACHE_SIZE:
+            self._peer_cache.popitem(last=False)
+        return peer
+
+    async def _send_with_ack(self, event, ack: str, chat_id: int, text: str):
+        """
+        Direct send to chat_id, overlapped with answering the button press.
+
+        The answer does not depend on the send, so both round-trips run at once.
+        Only a failed send is raised - a failed answer doesn't undo a delivered message.
+        """
+        async def send():
+            client = await self._get_send_client()
+            await client.send_message(await self._get_send_peer(client, chat_id), text)
+
+        sent, _ = await asyncio.gather(send(), event.answer(ack, alert=False), return_exceptions=True)
+        if isinstance(sent, BaseException):
+            raise sent
+
+    async def _warm_send_peer(self, chat_id: int):
+        """Resolve chat_id on the send client ahead of the Send button (access hashes are per account)"""
+        if chat_id in self._peer_cache:
+            return
+        try:
+            await self._get_send_peer(await self._get_send_client(), chat_id)
+        except Exception as e:
+            logger.debug("[DRAFT BOT] [DIRECT SEND] Peer %s not pre-resolved: %s", chat_id, e)
 
     async def stop(self):
         """Stop the bot"""
+        for task in (self._notify_task, self._review_task):
+            if task:
+                task.cancel()
+        # Let in-flight notifications and post-send work finish before the clients go away
+        if self._background_tasks:
+            await asyncio.wait(set(self._background_tasks), timeout=STOP_DRAIN_TIMEOUT)
+        if self._send_client is not None:
+            await self._send_client.disconnect()
         await self.tg_service.disconnect()
-        print("[DRAFT BOT] Stopped")
+        logger.info("[DRAFT BOT] Stopped")
 
 
 # ============================================================================
@@ -1435,19 +2015,19 @@ async def run_draft_bot():
     owner_id = int(os.getenv("OWNER_TELEGRAM_ID", "0"))
 
     if not bot_token:
-        print("[ERROR] TELEGRAM_BOT_TOKEN not set in .env")
+        logger.error("[ERROR] TELEGRAM_BOT_TOKEN not set in .env")
         return None
 
     if owner_id == 0:
-        print("[ERROR] OWNER_TELEGRAM_ID not set in .env")
+        logger.error("[ERROR] OWNER_TELEGRAM_ID not set in .env")
         return None
 
     bot = DraftReviewBot(api_id, api_hash, bot_token, owner_id)
     success = await bot.start()
 
     if success:
-        print("[DRAFT BOT] [OK] Bot is ready for draft review")
+        logger.info("[DRAFT BOT] [OK] Bot is ready for draft review")
         return bot
     else:
-        print("[ERROR] Failed to start draft bot")
+        logger.error("[ERROR] Failed to start draft bot")
         return None
@@ -4,11 +4,14 @@ Collects analytics from reports folder and prepares data for Excel export.
 """
 
 import os
+import logging
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # EXCEL DATA COLLECTOR
@@ -71,9 +74,7 @@ class ExcelDataCollector:
                 print(f"[EXCEL] Processing: {report_file.name}")
                 self._process_report_file(report_file)
             except Exception as e:
-                print(f"[EXCEL] [ERROR] Failed to process {report_file.name}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("[EXCEL] [ERROR] Failed to process %s: %s", report_file.name, e)
 
         print(f"[EXCEL] ===== DATA COLLECTION COMPLETE =====")
         print(f"[EXCEL] Total chats processed: {self.data['total_chats']}")
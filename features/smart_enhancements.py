@@ -6,6 +6,7 @@ Smart Enhancements Module
 """
 
 import os
+import re
 import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -15,6 +16,28 @@ import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 
+# Auto-booking: patterns compiled once at import (detect_meeting_request runs on every approved reply)
+_MEETING_KEYWORDS_RE = re.compile("|".join(map(re.escape, (
+    'зустріч', 'встреча', 'meeting', 'зустрінемося', 'побачимось',
+    'приїхати', 'прийти', 'коли можна', 'коли вільний'
+))))
+_MEETING_DATE_RE = re.compile("|".join((
+    r'(\d{1,2}[./]\d{1,2})',  # DD.MM or DD/MM
+    r'(завтра|сьогодні|післязавтра)',  # Ukrainian
+    r'(tomorrow|today)',  # English
+    r'(\d{1,2}\s+(?:січня|лютого|березня|квітня|травня|червня|липня|серпня|вересня|жовтня|листопада|грудня))'
+)))
+_MEETING_TIME_RE = re.compile("|".join((
+    r'(\d{1,2}:\d{2})',  # HH:MM
+    r'(\d{1,2}\s*годин)',  # X година
+    r'(ранку|вечора|дня)'  # Morning/evening
+)))
+
+
+def has_meeting_hint(message_text: str) -> bool:
+    """Cheap prefilter: does the message mention a meeting at all"""
+    return _MEETING_KEYWORDS_RE.search(message_text.lower()) is not None
+
 
 class KnowledgeBaseManager:
     """Analyzes successful replies and updates instructions"""
@@ -171,7 +194,12 @@ class FinanceExporter:
         return transactions
 
     def generate_excel_report(self, chat_stats: List[Dict], messages: List[Dict]) -> str:
-        """Generate comprehensive Excel report"""
+        """
+        Generate comprehensive Excel report
+
+        Returns the path of the saved workbook - the file always exists on return.
+        Any failure (openpyxl, disk) is raised, never reported via the return value.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = self.export_dir / f"aibi_report_{timestamp}.xlsx"
 
@@ -242,54 +270,17 @@ class AutoBookingManager:
 
     async def detect_meeting_request(self, message_text: str, ai_response: str) -> Optional[Dict]:
         """Detect if message contains meeting request"""
-        meeting_keywords = [
-            'зустріч', 'встреча', 'meeting', 'зустрінемося', 'побачимось',
-            'приїхати', 'прийти', 'коли можна', 'коли вільний'
-        ]
-
         text_lower = message_text.lower()
-        has_meeting_keyword = any(kw in text_lower for kw in meeting_keywords)
-
-        if not has_meeting_keyword:
+        if not _MEETING_KEYWORDS_RE.search(text_lower):
             return None
 
-        # Try to extract date/time
-        import re
-        from dateutil import parser
-
-        # Common patterns
-        date_patterns = [
-            r'(\d{1,2}[./]\d{1,2})',  # DD.MM or DD/MM
-            r'(завтра|сьогодні|післязавтра)',  # Ukrainian
-            r'(tomorrow|today)',  # English
-            r'(\d{1,2}\s+(?:січня|лютого|березня|квітня|травня|червня|липня|серпня|вересня|жовтня|листопада|грудня))'
-        ]
-
-        time_patterns = [
-            r'(\d{1,2}:\d{2})',  # HH:MM
-            r'(\d{1,2}\s*годин)',  # X година
-            r'(ранку|вечора|дня)'  # Morning/evening
-        ]
-
-        extracted_info = {
+        return {
             'has_meeting': True,
-            'date_mentioned': False,
-            'time_mentioned': False,
+            'date_mentioned': _MEETING_DATE_RE.search(text_lower) is not None,
+            'time_mentioned': _MEETING_TIME_RE.search(text_lower) is not None,
             'raw_text': message_text
         }
 
-        for pattern in date_patterns:
-            if re.search(pattern, text_lower):
-                extracted_info['date_mentioned'] = True
-                break
-
-        for pattern in time_patterns:
-            if re.search(pattern, text_lower):
-                extracted_info['time_mentioned'] = True
-                break
-
-        return extracted_info
-
     async def create_pending_meeting(self, chat_id: int, chat_title: str, message_text: str,
                                     meeting_info: Dict) -> str:
         """Create 'Pending Meeting' event in Google Calendar"""
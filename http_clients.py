@@ -0,0 +1,105 @@
+"""
+Shared HTTP clients for AI providers.
+
+One pooled AsyncOpenAI client per event loop: agents and reply generators reuse
+the same keep-alive connections instead of opening a new TLS pool per instance.
+The app runs several event loops (draft bot thread, scheduler, Flask requests),
+and an httpx pool must not be shared between loops - hence the per-loop cache.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+try:
+    import h2  # noqa: F401 - needed by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+_TIMEOUT = 30.0
+
+# {event_loop: {api_key: AsyncOpenAI}}
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+# Ліміт одночасних запитів до Perplexity (щоб не ловити 429 під навантаженням)
+PPLX_MAX_INFLIGHT = int(os.getenv("PPLX_MAX_INFLIGHT", "16"))
+
+# Сильні посилання на фонові задачі (event loop тримає лише слабкі)
+_background_tasks: set = set()
+
+# {event_loop: asyncio.Semaphore}
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _build_client(api_key: str) -> AsyncOpenAI:
+    """Creates AsyncOpenAI with a pooled (HTTP/2 when available) httpx client"""
+    http_client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=_LIMITS, timeout=_TIMEOUT)
+    return AsyncOpenAI(api_key=api_key, base_url=PERPLEXITY_BASE_URL, http_client=http_client)
+
+
+def get_perplexity_client(api_key: str) -> AsyncOpenAI:
+    """
+    Returns the shared Perplexity client for the current event loop.
+
+    Outside a running loop a fresh (unshared) client is returned.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _build_client(api_key)
+
+    loop_clients = _clients.setdefault(loop, {})
+    client: Optional[AsyncOpenAI] = loop_clients.get(api_key)
+    if client is None or client.is_closed():
+        client = _build_client(api_key)
+        loop_clients[api_key] = client
+    return client
+
+
+def get_request_semaphore() -> asyncio.Semaphore:
+    """
+    Returns the semaphore bounding in-flight Perplexity requests on the current loop.
+
+    Must be called from a coroutine (asyncio primitives are bound to their loop).
+    """
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(PPLX_MAX_INFLIGHT)
+        _semaphores[loop] = sem
+    return sem
+
+
+async def _warm_up(api_key: str) -> None:
+    try:
+        await get_perplexity_client(api_key).models.list()
+        logger.debug("[HTTP] Perplexity connection pool warmed up")
+    except Exception as e:
+        # Прогрів - лише оптимізація: помилка тут не повинна нічого ламати
+        logger.debug("[HTTP] Perplexity warm-up failed: %s", e)
+
+
+def warm_up_perplexity_client(api_key: Optional[str]) -> Optional[asyncio.Task]:
+    """
+    Opens the pooled connection (DNS + TLS + HTTP/2) in the background,
+    so the first real request on this loop doesn't pay the cold-start cost.
+
+    Must be called from a running event loop; returns the background task.
+    """
+    if not api_key:
+        return None
+    task = asyncio.create_task(_warm_up(api_key))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -1,5 +1,10 @@
 import asyncio
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import sys
 import traceback
 import threading
 from datetime import datetime, timedelta, timezone
@@ -12,16 +17,38 @@ from types import SimpleNamespace
 # Імпорт твоїх модулів
 from telegram_client import TelegramCollector, TelegramConfig
 from ai_client import AIConfig, MultiAgentAnalyzer, PerplexitySonarAgent
+from http_clients import warm_up_perplexity_client
 from utils import ensure_dir, read_instructions, sanitize_filename, ChatHistory
 from trello_client import TrelloClient
 from calendar_client import GoogleCalendarClient
-from auto_reply import AutoReplyGenerator, is_working_hours, draft_system
+from auto_reply import AutoReplyGenerator, is_working_hours, draft_system, REPLY_HISTORY_CHARS
 from draft_bot import DraftReviewBot
 from web.session_manager import AnalysisCache, SessionManager
 from web.telegram_auth import WebTelegramAuth
 from features.smart_logic import SmartDecisionEngine, DataSourceManager
 
+# uvloop (libuv) - швидший event loop для бота і планувальника; на Windows не підтримується.
+# Політика діє на всі цикли, створені далі (new_event_loop() у потоці бота, asyncio.run()).
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
 load_dotenv()
+# Логи пишуться в stdout окремим потоком: виклик logger.* з event loop лише кладе запис у чергу
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger(__name__)
 app = Flask(__name__)
 print(f"[DEBUG] Flask app instance created: {id(app)}")
 app.secret_key = os.getenv("FLASK_SECRET_KEY", os.urandom(32))
@@ -223,6 +250,8 @@ def start_draft_bot_background():
             print("[DRAFT BOT] Attempting connection with 200-second timeout...")
 
             async def startup_with_timeout():
+                # Прогріваємо з'єднання з Perplexity паралельно з підключенням до Telegram
+                warm_up_perplexity_client(os.getenv("AI_API_KEY"))
                 try:
                     # Create a task for bot startup
                     startup_task = asyncio.create_task(bot.start())
@@ -282,9 +311,7 @@ def start_draft_bot_background():
         except asyncio.CancelledError:
             print("[DRAFT BOT] [INFO] Bot loop cancelled (graceful shutdown)")
         except Exception as e:
-            print(f"[DRAFT BOT] [ERROR] Background bot error: {type(e).__name__}: {e}")
-            import traceback as tb
-            print(f"[DRAFT BOT] Full traceback:\n{tb.format_exc()}")
+            logger.exception("[DRAFT BOT] [ERROR] Background bot error: %s: %s", type(e).__name__, e)
         finally:
             try:
                 if loop and not loop.is_closed():
@@ -339,6 +366,8 @@ async def run_core_logic(draft_bot_param=None):
     
     agent = PerplexitySonarAgent(ai_key)
     analyzer = MultiAgentAnalyzer([agent])
+    # Поки підключаємось до Telegram, відкриваємо з'єднання з Perplexity
+    warm_up_perplexity_client(ai_key)
 
     async with TelegramCollector(tg_cfg) as collector:
         # Verify session is authenticated
@@ -659,7 +688,7 @@ async def run_core_logic(draft_bot_param=None):
                         print(f"[DRAFT GEN] Generating reply with unreadable_files=True...")
                         reply_text, reply_confidence = await reply_generator.generate_reply(
                             chat_title=accumulated_h.chat_title,
-                            message_history=accumulated_h.text,
+                            message_history=accumulated_h.tail(REPLY_HISTORY_CHARS),
                             analysis_report=result['report'],
                             has_unreadable_files=True
                         )
@@ -672,8 +701,10 @@ async def run_core_logic(draft_bot_param=None):
 
                             # Send to owner for review
                             print(f"[DRAFT SEND] Sending draft to bot for review...")
-                            await draft_bot.send_draft_for_review(accumulated_h.chat_id, accumulated_h.chat_title, reply_text, reply_confidence)
-                            print(f"[DRAFT SUCCESS] Draft sent to owner for review: '{accumulated_h.chat_title}'")
+                            if await draft_bot.send_draft_for_review(accumulated_h.chat_id, accumulated_h.chat_title, reply_text, reply_confidence):
+                                print(f"[DRAFT SUCCESS] Draft sent to owner for review: '{accumulated_h.chat_title}'")
+                            else:
+                                print(f"[DRAFT FAIL] Draft not handed to the bot (see log): '{accumulated_h.chat_title}'")
 
                             # Log to report
                             with open(file_name, "a", encoding="utf-8") as f:
@@ -703,7 +734,7 @@ async def run_core_logic(draft_bot_param=None):
                     print(f"[REPLY GEN] Generating auto-reply text...")
                     reply_text, reply_confidence = await reply_generator.generate_reply(
                         chat_title=accumulated_h.chat_title,
-                        message_history=accumulated_h.text,
+                        message_history=accumulated_h.tail(REPLY_HISTORY_CHARS),
                         analysis_report=result['report'],
                         has_unreadable_files=False
                     )
@@ -783,7 +814,7 @@ async def run_core_logic(draft_bot_param=None):
                     print(f"[DRAFT GEN] Generating draft reply...")
                     reply_text, reply_confidence = await reply_generator.generate_reply(
                         chat_title=accumulated_h.chat_title,
-                        message_history=accumulated_h.text,
+                        message_history=accumulated_h.tail(REPLY_HISTORY_CHARS),
                         analysis_report=result['report'],
                         has_unreadable_files=False
                     )
@@ -796,8 +827,10 @@ async def run_core_logic(draft_bot_param=None):
 
                         # Send to owner for review
                         print(f"[DRAFT SEND] Sending draft to bot owner for review...")
-                        await draft_bot.send_draft_for_review(accumulated_h.chat_id, accumulated_h.chat_title, reply_text, reply_confidence)
-                        print(f"[DRAFT SUCCESS] Draft sent to owner: '{accumulated_h.chat_title}' ({reply_confidence}%)")
+                        if await draft_bot.send_draft_for_review(accumulated_h.chat_id, accumulated_h.chat_title, reply_text, reply_confidence):
+                            print(f"[DRAFT SUCCESS] Draft sent to owner: '{accumulated_h.chat_title}' ({reply_confidence}%)")
+                        else:
+                            print(f"[DRAFT FAIL] Draft not handed to the bot (see log): '{accumulated_h.chat_title}'")
 
                         # Log to report
                         with open(file_name, "a", encoding="utf-8") as f:
@@ -865,7 +898,6 @@ async def fetch_chats_only(limit: int = 50, hours_ago: int = 24) -> list:
     """
     try:
         from telethon import TelegramClient
-        from datetime import datetime
 
         session_name = "aibi_session"  # HARDCODED - use authenticated session
         api_id = int(os.getenv("TG_API_ID"))
@@ -1050,8 +1082,7 @@ def scheduled_task():
         # Pass global bot instance to scheduled analysis
         asyncio.run(run_core_logic(draft_bot_param=DRAFT_BOT))
     except Exception as e:
-        print(f"[SCHEDULER ERROR] Task execution failed: {type(e).__name__}: {e}")
-        print(f"[SCHEDULER ERROR] Full traceback:\n{traceback.format_exc()}")
+        logger.exception("[SCHEDULER ERROR] Task execution failed: %s: %s", type(e).__name__, e)
         print("[SCHEDULER RECOVERY] Task will retry on next scheduled cycle (20 minutes)")
         # Scheduler will automatically retry on next cycle
 
@@ -1071,8 +1102,7 @@ def weekly_knowledge_base_task():
 
         print("[KNOWLEDGE BASE] Weekly analysis completed")
     except Exception as e:
-        print(f"[KNOWLEDGE BASE ERROR] Weekly task failed: {type(e).__name__}: {e}")
-        print(f"[KNOWLEDGE BASE ERROR] Full traceback:\n{traceback.format_exc()}")
+        logger.exception("[KNOWLEDGE BASE ERROR] Weekly task failed: %s: %s", type(e).__name__, e)
 
 
 # Make scheduler optional (disabled by default for manual mode)
@@ -1,13 +1,15 @@
 """Standalone Telegram message service using direct int IDs (no GetUsersRequest)"""
 
 import asyncio
-import traceback
+import logging
 import sqlite3
 import time
 from pathlib import Path
 from telethon import TelegramClient
 from telethon.errors import AuthKeyUnregisteredError
 
+logger = logging.getLogger(__name__)
+
 
 class TelegramService:
     """Simple service for sending Telegram messages using direct integer IDs"""
@@ -23,18 +25,18 @@ class TelegramService:
 
     async def connect(self):
         """Connect to Telegram using bot token WITH EXPLICIT 15-SECOND TIMEOUT"""
-        print(f"\n[TG_SERVICE] >>> Connecting to Telegram...")
-        print(f"[TG_SERVICE] API ID: {self.api_id}")
-        print(f"[TG_SERVICE] API Hash: {'*' * 10}...")
-        print(f"[TG_SERVICE] Bot Token: ...{self.bot_token[-10:]}")
-        print(f"[TG_SERVICE] Session: {self.session_name}")
+        logger.info("[TG_SERVICE] >>> Connecting to Telegram...")
+        logger.info("[TG_SERVICE] API ID: %s", self.api_id)
+        logger.info("[TG_SERVICE] API Hash: **********...")
+        logger.info("[TG_SERVICE] Bot Token: ...%s", self.bot_token[-10:])
+        logger.info("[TG_SERVICE] Session: %s", self.session_name)
 
         # MASTER FIX: Force-delete session files before connection to prevent DB locks
-        print(f"\n[TG_SERVICE] [FORCE CLEANUP] Removing old session files...")
+        logger.info("[TG_SERVICE] [FORCE CLEANUP] Removing old session files...")
         await self._force_cleanup_sessions()
 
         # CRITICAL FIX: Check if session file is locked BEFORE attempting connection
-        print(f"\n[TG_SERVICE] [SAFETY CHECK] Checking for locked session files...")
+        logger.info("[TG_SERVICE] [SAFETY CHECK] Checking for locked session files...")
         session_file = f"{self.session_name}.session"
         session_journal = f"{self.session_name}.session-journal"
 
@@ -43,95 +45,95 @@ class TelegramService:
                 # Try to open the file to see if it's locked
                 with open(session_file, 'a'):
                     pass
-                print(f"[TG_SERVICE] [OK] Session file '{session_file}' is accessible")
+                logger.info("[TG_SERVICE] [OK] Session file '%s' is accessible", session_file)
             except IOError as e:
-                print(f"[TG_SERVICE] [CRITICAL] Session file is LOCKED: {e}")
-                print(f"[TG_SERVICE] [CRITICAL] Another process is using this session!")
-                print(f"[TG_SERVICE] [RECOVERY] Attempting to clean up locked session...")
+                logger.error("[TG_SERVICE] [CRITICAL] Session file is LOCKED: %s", e)
+                logger.error("[TG_SERVICE] [CRITICAL] Another process is using this session!")
+                logger.info("[TG_SERVICE] [RECOVERY] Attempting to clean up locked session...")
                 await self._force_cleanup_sessions()
                 # Wait 2 seconds for file handles to release
                 await asyncio.sleep(2)
-                print(f"[TG_SERVICE] [RETRY] Retrying after cleanup...")
+                logger.info("[TG_SERVICE] [RETRY] Retrying after cleanup...")
 
         if Path(session_journal).exists():
-            print(f"[TG_SERVICE] [WARNING] Journal file exists - session may be in recovery")
+            logger.warning("[TG_SERVICE] [WARNING] Journal file exists - session may be in recovery")
 
         for attempt in range(3):
             try:
-                print(f"\n[TG_SERVICE] [ATTEMPT {attempt + 1}/3] Creating TelegramClient...")
+                logger.info("[TG_SERVICE] [ATTEMPT %s/3] Creating TelegramClient...", attempt + 1)
                 # FIX: Use MemorySession to avoid database locks entirely
                 from telethon.sessions import MemorySession
-                print(f"[TG_SERVICE] Using MemorySession (no file locks)")
+                logger.info("[TG_SERVICE] Using MemorySession (no file locks)")
                 self.client = TelegramClient(MemorySession(), self.api_id, self.api_hash)
 
-                print(f"[TG_SERVICE] [ATTEMPT {attempt + 1}/3] Connecting to Telegram servers (120s timeout)...")
+                logger.info("[TG_SERVICE] [ATTEMPT %s/3] Connecting to Telegram servers (120s timeout)...", attempt + 1)
                 # INCREASED TIMEOUT: Give network more time to establish connection
                 try:
                     await asyncio.wait_for(self.client.connect(), timeout=120.0)
                 except asyncio.TimeoutError:
-                    print(f"[TG_SERVICE] [TIMEOUT] Connection attempt timed out after 120 seconds")
+                    logger.warning("[TG_SERVICE] [TIMEOUT] Connection attempt timed out after 120 seconds")
                     raise TimeoutError("Telegram connection timed out after 120 seconds")
-                print(f"[TG_SERVICE] [ATTEMPT {attempt + 1}/3] [OK] TCP connection established")
+                logger.info("[TG_SERVICE] [ATTEMPT %s/3] [OK] TCP connection established", attempt + 1)
 
-                print(f"[TG_SERVICE] [ATTEMPT {attempt + 1}/3] Starting with bot token (60s timeout)...")
+                logger.info("[TG_SERVICE] [ATTEMPT %s/3] Starting with bot token (60s timeout)...", attempt + 1)
                 # INCREASED TIMEOUT: Give bot authentication more time
                 try:
                     await asyncio.wait_for(self.client.start(bot_token=self.bot_token), timeout=60.0)
                 except asyncio.TimeoutError:
-                    print(f"[TG_SERVICE] [TIMEOUT] Bot authentication timed out after 60 seconds")
+                    logger.warning("[TG_SERVICE] [TIMEOUT] Bot authentication timed out after 60 seconds")
                     raise TimeoutError("Bot authentication timed out after 60 seconds")
-                print(f"[TG_SERVICE] [ATTEMPT {attempt + 1}/3] [OK] Bot authenticated")
+                logger.info("[TG_SERVICE] [ATTEMPT %s/3] [OK] Bot authenticated", attempt + 1)
 
                 # Verify connection - FIX AttributeError
                 me = await self.client.get_me()
-                print(f"[TG_SERVICE] [OK] [SUCCESS] Connected as bot: @{me.username if hasattr(me, 'username') and me.username else 'no_username'}")
-                print(f"[TG_SERVICE] [OK] Bot ID: {me.id}")
+                logger.info("[TG_SERVICE] [OK] [SUCCESS] Connected as bot: @%s", me.username if hasattr(me, 'username') and me.username else 'no_username')
+                logger.info("[TG_SERVICE] [OK] Bot ID: %s", me.id)
                 # Fix: Check if is_bot attribute exists
                 is_bot = getattr(me, 'is_bot', getattr(me, 'bot', False))
-                print(f"[TG_SERVICE] [OK] Bot is valid: {is_bot}")
-                print(f"[TG_SERVICE] [OK] Session is active and ready for messaging")
+                logger.info("[TG_SERVICE] [OK] Bot is valid: %s", is_bot)
+                logger.info("[TG_SERVICE] [OK] Session is active and ready for messaging")
                 return True
 
             except sqlite3.OperationalError as e:
-                print(f"[TG_SERVICE] [ERROR] [DB LOCKED] Attempt {attempt + 1}/3")
-                print(f"[TG_SERVICE] SQLite Error: {e}")
-                print(f"[TG_SERVICE] Database is locked - forcing cleanup...")
+                logger.error("[TG_SERVICE] [ERROR] [DB LOCKED] Attempt %s/3", attempt + 1)
+                logger.error("[TG_SERVICE] SQLite Error: %s", e)
+                logger.info("[TG_SERVICE] Database is locked - forcing cleanup...")
                 await self._force_cleanup_sessions()
                 if attempt < 2:
                     wait_time = 2  # Fixed 2 second wait for DB locks
-                    print(f"[TG_SERVICE] Waiting {wait_time}s for DB lock to clear...")
+                    logger.info("[TG_SERVICE] Waiting %ss for DB lock to clear...", wait_time)
                     await asyncio.sleep(wait_time)
 
             except AuthKeyUnregisteredError as e:
-                print(f"[TG_SERVICE] [ERROR] [AUTH ERROR] Attempt {attempt + 1}/3")
-                print(f"[TG_SERVICE] Error: {e}")
-                print(f"[TG_SERVICE] Cleaning up session files...")
+                logger.error("[TG_SERVICE] [ERROR] [AUTH ERROR] Attempt %s/3", attempt + 1)
+                logger.error("[TG_SERVICE] Error: %s", e)
+                logger.info("[TG_SERVICE] Cleaning up session files...")
                 await self._recover_from_auth_error()
                 if attempt < 2:
                     wait_time = 2 ** attempt
-                    print(f"[TG_SERVICE] Waiting {wait_time}s before retry...")
+                    logger.info("[TG_SERVICE] Waiting %ss before retry...", wait_time)
                     await asyncio.sleep(wait_time)
 
             except AttributeError as e:
-                print(f"[TG_SERVICE] [ERROR] [ATTRIBUTE ERROR] Attempt {attempt + 1}/3")
-                print(f"[TG_SERVICE] Error: {e}")
-                print(f"[TG_SERVICE] Likely 'User' object issue - cleaning session...")
+                logger.error("[TG_SERVICE] [ERROR] [ATTRIBUTE ERROR] Attempt %s/3", attempt + 1)
+                logger.error("[TG_SERVICE] Error: %s", e)
+                logger.info("[TG_SERVICE] Likely 'User' object issue - cleaning session...")
                 await self._force_cleanup_sessions()
                 if attempt < 2:
                     await asyncio.sleep(2)
 
             except Exception as e:
-                print(f"[TG_SERVICE] [ERROR] [ERROR] Attempt {attempt + 1}/3: {type(e).__name__}")
-                print(f"[TG_SERVICE] Message: {e}")
+                logger.error("[TG_SERVICE] [ERROR] [ERROR] Attempt %s/3: %s", attempt + 1, type(e).__name__)
+                logger.error("[TG_SERVICE] Message: %s", e)
                 if attempt < 2:
                     wait_time = 2 ** attempt
-                    print(f"[TG_SERVICE] Waiting {wait_time}s before retry...")
+                    logger.info("[TG_SERVICE] Waiting %ss before retry...", wait_time)
                     await asyncio.sleep(wait_time)
                 else:
-                    print(f"[TG_SERVICE] [LAST ATTEMPT] Traceback:\n{traceback.format_exc()}")
+                    logger.exception("[TG_SERVICE] [LAST ATTEMPT] Connect failed")
 
-        print(f"\n[TG_SERVICE] [ERROR] [CRITICAL FAILURE] Could not connect after 3 attempts")
-        print(f"[TG_SERVICE] Check your Telegram credentials and internet connection")
+        logger.error("[TG_SERVICE] [ERROR] [CRITICAL FAILURE] Could not connect after 3 attempts")
+        logger.info("[TG_SERVICE] Check your Telegram credentials and internet connection")
         return False
 
     async def send_message(self, recipient_id: int, text: str, buttons=None):
@@ -144,63 +146,59 @@ class TelegramService:
             buttons: Optional Telethon button objects
 
         Returns:
-            True if successful, False otherwise
+            The sent Message if successful (truthy), False otherwise
         """
-        print(f"\n[TG_SERVICE] >>> send_message() called")
-        print(f"[TG_SERVICE] Recipient ID: {recipient_id} (type: {type(recipient_id).__name__})")
-        print(f"[TG_SERVICE] Text length: {len(text)} chars")
-        print(f"[TG_SERVICE] Has buttons: {buttons is not None}")
-        print(f"[TG_SERVICE] Client connected: {self.client is not None and self.client.is_connected() if self.client else False}")
+        # Per-message diagnostics at DEBUG: one lazily formatted record instead of five stdout writes
+        logger.debug("[TG_SERVICE] >>> send_message() to %s: %d chars, buttons=%s",
+                     recipient_id, len(text), buttons is not None)
 
         if not self.client:
-            print(f"[TG_SERVICE] [ERROR] [ERROR] Client is None!")
+            logger.error("[TG_SERVICE] [ERROR] [ERROR] Client is None!")
             return False
 
         if not self.client.is_connected():
-            print(f"[TG_SERVICE] [ERROR] [ERROR] Client not connected to Telegram!")
+            logger.error("[TG_SERVICE] [ERROR] [ERROR] Client not connected to Telegram!")
             return False
 
-        print(f"[TG_SERVICE] [OK] Client is ready. Starting message send attempts...")
-
         for attempt in range(self.max_retries):
             try:
-                print(f"[TG_SERVICE] [ATTEMPT {attempt + 1}/{self.max_retries}] Sending message...")
+                logger.debug("[TG_SERVICE] [ATTEMPT %s/%s] Sending message...", attempt + 1, self.max_retries)
                 # DIRECT INT ID - Critical to avoid GetUsersRequest error
-                await self.client.send_message(
+                sent = await self.client.send_message(
                     int(recipient_id),  # Use int directly, no entity lookup
                     text,
                     buttons=buttons
                 )
-                print(f"[TG_SERVICE] [OK] [SUCCESS] Message delivered to {recipient_id}")
-                return True
+                logger.debug("[TG_SERVICE] [OK] [SUCCESS] Message delivered to %s", recipient_id)
+                return sent
 
             except AuthKeyUnregisteredError as e:
-                print(f"[TG_SERVICE] [WARN]  [AUTH ERROR] Attempt {attempt + 1}/{self.max_retries}")
-                print(f"[TG_SERVICE] Error: {e}")
+                logger.warning("[TG_SERVICE] [WARN]  [AUTH ERROR] Attempt %s/%s", attempt + 1, self.max_retries)
+                logger.warning("[TG_SERVICE] Error: %s", e)
                 await self._recover_from_auth_error()
                 if attempt < self.max_retries - 1:
                     wait_time = 2 ** attempt
-                    print(f"[TG_SERVICE] Waiting {wait_time}s before retry...")
+                    logger.debug("[TG_SERVICE] Waiting %ss before retry...", wait_time)
                     await asyncio.sleep(wait_time)
 
             except Exception as e:
-                print(f"[TG_SERVICE] [ERROR] [ERROR] Attempt {attempt + 1}/{self.max_retries}")
-                print(f"[TG_SERVICE] Exception: {type(e).__name__}: {e}")
+                logger.error("[TG_SERVICE] [ERROR] [ERROR] Attempt %s/%s", attempt + 1, self.max_retries)
+                logger.error("[TG_SERVICE] Exception: %s: %s", type(e).__name__, e)
                 if attempt < self.max_retries - 1:
                     wait_time = 2 ** attempt
-                    print(f"[TG_SERVICE] Waiting {wait_time}s before retry...")
+                    logger.debug("[TG_SERVICE] Waiting %ss before retry...", wait_time)
                     await asyncio.sleep(wait_time)
                 else:
-                    print(f"[TG_SERVICE] [LAST ATTEMPT FAILED] Full traceback:\n{traceback.format_exc()}")
+                    logger.exception("[TG_SERVICE] [LAST ATTEMPT FAILED] Send failed")
 
-        print(f"[TG_SERVICE] [ERROR] [FINAL FAILURE] Could not send message after {self.max_retries} attempts")
+        logger.error("[TG_SERVICE] [ERROR] [FINAL FAILURE] Could not send message after %s attempts", self.max_retries)
         return False
 
     async def disconnect(self):
         """Disconnect from Telegram"""
         if self.client and self.client.is_connected():
             await self.client.disconnect()
-            print("[TG_SERVICE] [OK] Disconnected from Telegram")
+            logger.info("[TG_SERVICE] [OK] Disconnected from Telegram")
 
     async def _force_cleanup_sessions(self):
         """MASTER FIX: Force-delete all session files before connection"""
@@ -221,29 +219,29 @@ class TelegramService:
                         for retry in range(3):
                             try:
                                 session_path.unlink()
-                                print(f"[TG_SERVICE] [CLEANUP] Deleted: {session_file}")
+                                logger.info("[TG_SERVICE] [CLEANUP] Deleted: %s", session_file)
                                 deleted_count += 1
                                 break
                             except PermissionError:
                                 if retry < 2:
                                     await asyncio.sleep(0.5)
                                 else:
-                                    print(f"[TG_SERVICE] [WARN] Could not delete {session_file} (locked)")
+                                    logger.warning("[TG_SERVICE] [WARN] Could not delete %s (locked)", session_file)
                     except Exception as e:
-                        print(f"[TG_SERVICE] [WARN] Error deleting {session_file}: {e}")
+                        logger.warning("[TG_SERVICE] [WARN] Error deleting %s: %s", session_file, e)
 
             if deleted_count > 0:
-                print(f"[TG_SERVICE] [CLEANUP] Removed {deleted_count} session file(s)")
+                logger.info("[TG_SERVICE] [CLEANUP] Removed %s session file(s)", deleted_count)
             else:
-                print(f"[TG_SERVICE] [CLEANUP] No session files to remove (clean start)")
+                logger.info("[TG_SERVICE] [CLEANUP] No session files to remove (clean start)")
 
             # Disconnect existing client if any
             if self.client and self.client.is_connected():
                 await self.client.disconnect()
-                print(f"[TG_SERVICE] [CLEANUP] Disconnected existing client")
+                logger.info("[TG_SERVICE] [CLEANUP] Disconnected existing client")
 
         except Exception as e:
-            print(f"[TG_SERVICE] [ERROR] Force cleanup error: {type(e).__name__}: {e}")
+            logger.error("[TG_SERVICE] [ERROR] Force cleanup error: %s: %s", type(e).__name__, e)
 
     async def _recover_from_auth_error(self):
         """Clean up session files after auth error"""
@@ -259,9 +257,9 @@ class TelegramService:
                 session_path = Path(session_file)
                 if session_path.exists():
                     session_path.unlink()
-                    print(f"[TG_SERVICE] [OK] Cleaned: {session_file}")
+                    logger.info("[TG_SERVICE] [OK] Cleaned: %s", session_file)
 
             if self.client and self.client.is_connected():
                 await self.client.disconnect()
         except Exception as e:
-            print(f"[TG_SERVICE] [ERROR] Recovery error: {type(e).__name__}: {e}")
+            logger.error("[TG_SERVICE] [ERROR] Recovery error: %s: %s", type(e).__name__, e)
@@ -8,12 +8,14 @@ class TrelloClient:
         self.token = token
         self.board_id = board_id
         self.base_url = "https://api.trello.com/1"
+        # Одна сесія на клієнт: keep-alive + пул з'єднань urllib3 замість TLS-рукостискання на кожен запит
+        self._session = requests.Session()
+        self._session.params = {"key": api_key, "token": token}
 
     def get_lists(self):
         """Отримує список всіх списків на дошці"""
         url = f"{self.base_url}/boards/{self.board_id}/lists"
-        params = {"key": self.api_key, "token": self.token}
-        resp = requests.get(url, params=params)
+        resp = self._session.get(url)
         resp.raise_for_status()
         return resp.json()
 
@@ -21,8 +23,6 @@ class TrelloClient:
         """Створює картку у вказаному списку"""
         url = f"{self.base_url}/cards"
         params = {
-            "key": self.api_key,
-            "token": self.token,
             "idList": list_id,
             "name": title,
             "desc": description
@@ -30,7 +30,7 @@ class TrelloClient:
         if labels:
             params["idLabels"] = ",".join(labels)
 
-        resp = requests.post(url, params=params)
+        resp = self._session.post(url, params=params)
         resp.raise_for_status()
         return resp.json()
 
@@ -48,3 +48,7 @@ class TrelloClient:
         title = f"[{confidence}%] {chat_title}"
         card = self.create_card(target_list["id"], title, report)
         return card
+
+    def close(self):
+        """Закриває пул з'єднань сесії"""
+        self._session.close()
@@ -19,6 +19,10 @@ class ChatHistory:
         if self.recent_messages is None:
             self.recent_messages = []
 
+    def tail(self, n_chars: int) -> str:
+        """Last n_chars of the chat text (no copy when the text is already short)"""
+        return self.text[-n_chars:] if len(self.text) > n_chars else self.text
+
     def is_owner_last_speaker(self) -> bool:
         """Check if owner was the last person to speak"""
         return self.last_sender_id is not None and self.last_sender_id == self.owner_id
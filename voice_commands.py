@@ -10,11 +10,14 @@ This module handles:
 
 import os
 import re
+import logging
 import tempfile
 from pathlib import Path
 from typing import Optional, Dict, List
 import asyncio
 
+logger = logging.getLogger(__name__)
+
 
 class VoiceCommandProcessor:
     """
@@ -82,9 +85,7 @@ class VoiceCommandProcessor:
             return transcribed_text
 
         except Exception as e:
-            print(f"[VOICE] [ERROR] Transcription failed: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[VOICE] [ERROR] Transcription failed: %s", e)
             return None
 
     def recognize_command(self, transcribed_text: str) -> Dict:
@@ -187,9 +188,7 @@ class VoiceCommandProcessor:
                 return False
 
         except Exception as e:
-            print(f"[VOICE] [REPORT] [ERROR] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[VOICE] [REPORT] [ERROR] %s", e)
             await event.reply(f"❌ [VOICE COMMAND] Error: {e}")
             return False
 
@@ -348,9 +347,7 @@ class VoiceCommandProcessor:
                 return True
 
         except Exception as e:
-            print(f"[VOICE] [DRAFT] [ERROR] {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[VOICE] [DRAFT] [ERROR] %s", e)
             await event.reply(f"❌ [VOICE COMMAND] Error: {e}")
             return False
 